@@ -0,0 +1,115 @@
+"""
+Benchmark of determining the kind of values by their concrete type, instead of isinstance checks
+with the abstract base classes, on large documents
+
+Run with:
+
+    python -m benchmarks.bench_dispatch
+"""
+
+import time
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Optional
+from unittest import mock
+
+import myst_nb_json.core
+from benchmarks.generators import GENERATORS
+from myst_nb_json import JsonRenderer, json_stats
+from myst_nb_json.core import (
+    _DICT,
+    _LIST,
+    _NUMBERS,
+    _SCALAR,
+    _SCALAR_TYPES,
+    _TABLE,
+    is_table,
+    numeric_values,
+)
+
+SIZE = 200_000
+DOCUMENTS = ("wide", "records", "redundant", "string_heavy")
+REPEATS = 3
+
+
+class _Uncached(dict):
+    """A type table that never caches, so that every type is checked against the ABCs"""
+
+    def __setitem__(self, key: Any, value: Any) -> None:
+        pass
+
+
+def abc_value_kind(
+    jsonable: Any, table_min_rows: Optional[int] = None, summary_min_items: Optional[int] = None
+) -> int:
+    """The previous implementation with isinstance checks"""
+    if isinstance(jsonable, Sequence) and not isinstance(jsonable, str) and len(jsonable) > 0:
+        if (
+            summary_min_items is not None
+            and len(jsonable) >= summary_min_items
+            and numeric_values(jsonable) is not None
+        ):
+            return _NUMBERS
+        if table_min_rows is not None and len(jsonable) >= table_min_rows and is_table(jsonable):
+            return _TABLE
+        return _LIST
+    elif isinstance(jsonable, Mapping) and len(jsonable) > 0:
+        return _DICT
+    elif (
+        summary_min_items is not None
+        and type(jsonable) not in _SCALAR_TYPES
+        and (values := numeric_values(jsonable)) is not None
+        and len(values) >= max(summary_min_items, 1)
+    ):
+        return _NUMBERS
+    return _SCALAR
+
+
+def values_of(document: Any) -> list:
+    values = []
+    stack = [document]
+    while stack:
+        value = stack.pop()
+        values.append(value)
+        if isinstance(value, dict):
+            stack.extend(value.values())
+        elif isinstance(value, list):
+            stack.extend(value)
+    return values
+
+
+def best_of(func: Callable[[], Any]) -> float:
+    seconds = []
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        func()
+        seconds.append(time.perf_counter() - start)
+    return min(seconds)
+
+
+def main():
+    renderer = JsonRenderer(inline_assets=False)
+    print(f"{'document':<14} {'nodes':>8} {'kind':>8} {'ABC':>8} {'html':>8} {'ABC':>8}  ns/node")
+    for name in DOCUMENTS:
+        document = GENERATORS[name](SIZE)
+        num_nodes, _ = json_stats(document)
+        values = values_of(document)
+        results = []
+        for patches in (
+            {"value_kind": myst_nb_json.core.value_kind},
+            {"value_kind": abc_value_kind, "_TYPE_CATEGORIES": _Uncached()},
+        ):
+            with mock.patch.multiple(myst_nb_json.core, **patches):
+                value_kind = myst_nb_json.core.value_kind
+                kind_seconds = best_of(lambda: [value_kind(value, 10, 100) for value in values])
+                html_seconds = best_of(lambda: renderer.html(document))
+            results.append((kind_seconds, html_seconds))
+        (kind, html), (abc_kind, abc_html) = results
+        print(
+            f"{name:<14} {num_nodes:8} {kind / len(values) * 1e9:8.0f} "
+            f"{abc_kind / len(values) * 1e9:8.0f} {html / num_nodes * 1e9:8.0f} "
+            f"{abc_html / num_nodes * 1e9:8.0f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""
+Benchmark of the start-up time of the command line interface, which only imports the renderer
+core, compared to the budget for rendering many files in separate processes
+
+Run with:
+
+    python -m benchmarks.bench_import
+"""
+
+import re
+import subprocess
+import sys
+
+# Maximum time in seconds for importing the renderer and the command line interface
+IMPORT_TIME_BUDGET = 0.2
+REPEATS = 5
+
+
+def measure(module: str) -> float:
+    """The cumulative import time of a module and its dependencies in seconds"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    (microseconds,) = re.findall(
+        rf"\|\s+(\d+) \| {re.escape(module)}$", result.stderr, re.MULTILINE
+    )
+    return int(microseconds) / 1e6
+
+
+def main() -> int:
+    for module in ("myst_nb_json.core", "myst_nb_json.__main__"):
+        seconds = min(measure(module) for _ in range(REPEATS))
+        print(f"{module:<25} {seconds * 1000:6.1f} ms")
+    # The command line interface imports the renderer core.
+    within_budget = seconds < IMPORT_TIME_BUDGET
+    print(f"budget {IMPORT_TIME_BUDGET * 1000:.0f} ms: {'ok' if within_budget else 'exceeded'}")
+    return 0 if within_budget else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,40 @@
+"""
+Benchmark of rendering a large root array on a process pool with different numbers of workers
+
+Run with:
+
+    python -m benchmarks.bench_parallel
+"""
+
+import os
+import time
+
+from myst_nb_json import JsonMimeRenderPlugin, get_process_pool
+
+NUM_RECORDS = 20_000
+
+
+def make_document() -> list:
+    return [
+        {"id": index, "name": f"item {index}", "tags": ["a", "b"], "nested": {"value": 0.5}}
+        for index in range(NUM_RECORDS)
+    ]
+
+
+def main():
+    document = make_document()
+    cpu_count = os.cpu_count() or 1
+    print(f"{cpu_count} CPUs")
+    for workers in sorted({1, 2, 4, cpu_count}):
+        plugin = JsonMimeRenderPlugin(workers=workers)
+        if workers > 1:
+            # Exclude starting the worker processes.
+            get_process_pool(workers).submit(int).result()
+        start = time.perf_counter()
+        plugin.html(document)
+        seconds = time.perf_counter() - start
+        print(f"{workers:>3} workers {seconds:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""
+Microbenchmark of the fixed per-output overhead of rendering small JSON outputs
+
+Run with:
+
+    python -m benchmarks.bench_per_output
+"""
+
+import timeit
+
+from myst_nb_json import JsonMimeRenderPlugin, get_plugin, read_resource
+
+SMALL_OUTPUT = {"key": "value", "number": 42, "list": [1, 2, 3]}
+NUMBER = 2000
+
+
+def render_with_fresh_plugin():
+    # Previous behavior: A new plugin per output, which reads the resource files again.
+    read_resource.cache_clear()
+    return JsonMimeRenderPlugin().html(SMALL_OUTPUT)
+
+
+def render_with_shared_plugin():
+    return get_plugin().html(SMALL_OUTPUT)
+
+
+def main():
+    for func in (render_with_fresh_plugin, render_with_shared_plugin):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f"{func.__name__:<30} {seconds / NUMBER * 1e6:8.1f} µs/output")
+
+
+if __name__ == "__main__":
+    main()
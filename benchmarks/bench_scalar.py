@@ -0,0 +1,47 @@
+"""
+Benchmark of serializing scalar values, on a document with 1M leaves
+
+Run with:
+
+    python -m benchmarks.bench_scalar
+"""
+
+import json
+import time
+from unittest import mock
+
+import myst_nb_json.core
+from myst_nb_json import format_scalar, get_plugin
+
+NUM_RECORDS = 10_000
+NUM_FIELDS = 100
+
+
+def make_document() -> list:
+    scalars = ["text", 'with "quotes"', 42, -7, 3.14, 1e-10, True, False, None, float("nan")]
+    return [
+        {f"field{index}": scalars[(record + index) % len(scalars)] for index in range(NUM_FIELDS)}
+        for record in range(NUM_RECORDS)
+    ]
+
+
+def measure(func) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+
+def main():
+    document = make_document()
+    leaves = [value for record in document for value in record.values()]
+    print(f"{len(leaves)} leaves")
+    for name, serialize in (("json.dumps", json.dumps), ("format_scalar", format_scalar)):
+        seconds = measure(lambda: [serialize(value) for value in leaves])
+        print(f"{name:<15} scalars {seconds:6.2f} s")
+        with mock.patch.object(myst_nb_json.core, "format_scalar", serialize):
+            seconds = measure(lambda: get_plugin().html(document))
+        print(f"{name:<15} html    {seconds:6.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Generators of synthetic JSON documents with different shapes
+
+Every generator is deterministic and takes a size, which is roughly the number of leaves.
+"""
+
+from typing import Any, Callable
+
+
+def wide(size: int) -> dict[str, Any]:
+    """A flat object with many keys of mixed scalar values"""
+    scalars = ["text", 42, 3.14, True, False, None]
+    return {f"key{index}": scalars[index % len(scalars)] for index in range(size)}
+
+
+def deep(size: int) -> dict[str, Any]:
+    """Objects nested as deep as the size, with one scalar per level"""
+    document: dict[str, Any] = {"leaf": 0}
+    for level in range(size - 1):
+        document = {"level": level, "child": document}
+    return document
+
+
+def records(size: int) -> list[dict[str, Any]]:
+    """An array of records with the same keys, like a table"""
+    num_fields = 10
+    return [
+        {
+            "id": index,
+            "name": f"record {index}",
+            "score": index * 0.5,
+            "active": index % 2 == 0,
+            "parent": None,
+            "tags": ["a", "b"],
+            "position": {"x": index, "y": -index},
+            "label": "x" * (index % 16),
+            "count": index % 7,
+            "ratio": 1 / (index + 1),
+        }
+        for index in range(max(1, size // num_fields))
+    ]
+
+
+def string_heavy(size: int) -> list[str]:
+    """An array of long strings, including characters that need escaping"""
+    return [f'line {index}: "quoted" \\ tab\t ünïcödé ' * 4 for index in range(size)]
+
+
+def numeric_heavy(size: int) -> list[list[float]]:
+    """An array of numeric rows, like a matrix or embeddings"""
+    row_length = 100
+    return [
+        [(row * row_length + column) / 7 for column in range(row_length)]
+        for row in range(max(1, size // row_length))
+    ]
+
+
+def redundant(size: int) -> list[dict[str, Any]]:
+    """An array of records which repeat the same nested objects, like API responses"""
+    schema = {
+        "type": "object",
+        "properties": {
+            "id": {"type": "integer"},
+            "name": {"type": "string", "maxLength": 64},
+            "tags": {"type": "array", "items": {"type": "string"}},
+        },
+    }
+    config = {"retries": 3, "timeout": 1.5, "hosts": ["a", "b", "c"]}
+    return [
+        {"id": index % 10, "schema": dict(schema), "config": dict(config)}
+        for index in range(max(1, size // 20))
+    ]
+
+
+GENERATORS: dict[str, Callable[[int], Any]] = {
+    "wide": wide,
+    "deep": deep,
+    "records": records,
+    "string_heavy": string_heavy,
+    "numeric_heavy": numeric_heavy,
+    "redundant": redundant,
+}
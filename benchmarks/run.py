@@ -0,0 +1,231 @@
+"""
+Benchmark suite for the renderer and the end-to-end MyST-NB build
+
+Every case is measured for time (best of several repeats), peak memory allocated in Python and
+output size. Results can be saved and compared against a previous run, which fails if a case got
+slower than the tolerance.
+
+Run with:
+
+    python -m benchmarks.run --save baseline.json
+    python -m benchmarks.run --compare baseline.json
+"""
+
+import argparse
+import atexit
+import json
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any, Callable, Optional
+
+from benchmarks.generators import GENERATORS
+from myst_nb_json import JsonMimeRenderPlugin, get_plugin
+from myst_nb_json.memo import RenderMemo
+
+DEFAULT_SIZE = 20_000
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.2
+NUM_NOTEBOOK_OUTPUTS = 50
+
+
+def bench_html(generator: Callable[[int], Any], size: int) -> Callable[[], int]:
+    document = generator(size)
+    plugin = get_plugin()
+    return lambda: len(plugin.html(document).encode())
+
+
+def bench_html_memo(generator: Callable[[int], Any], size: int) -> Callable[[], int]:
+    document = generator(size)
+    plugin = get_plugin()
+    # A new memo table per run, so that only repetitions within the document are reused.
+    return lambda: len(plugin.html(document, memo=RenderMemo(64 * 1024**2)).encode())
+
+
+def bench_html_compact(generator: Callable[[int], Any], size: int) -> Callable[[], int]:
+    document = generator(size)
+    plugin = get_plugin(compact=True)
+    return lambda: len(plugin.html(document).encode())
+
+
+def bench_handle_mime(generator: Callable[[int], Any], size: int) -> Callable[[], int]:
+    from myst_nb.core.render import MimeData
+
+    # Outside of Sphinx, the renderer is only used to look up the Sphinx environment.
+    renderer: Any = SimpleNamespace(renderer=SimpleNamespace(sphinx_env=None))
+    data = MimeData("application/json", generator(size))
+
+    def run() -> int:
+        nodes = JsonMimeRenderPlugin.handle_mime(renderer, data, inline=False)
+        assert nodes is not None
+        return len(nodes[0].astext().encode())
+
+    return run
+
+
+def bench_sphinx_build(generator: Callable[[int], Any], size: int) -> Callable[[], int]:
+    import nbformat
+    from sphinx.application import Sphinx
+    from sphinx.util.docutils import docutils_namespace, patch_docutils
+
+    source_dir = Path(tempfile.mkdtemp(prefix="myst-nb-json-bench-"))
+    atexit.register(shutil.rmtree, source_dir, ignore_errors=True)
+    (source_dir / "conf.py").write_text(
+        'extensions = ["myst_nb", "myst_nb_json"]\n'
+        'nb_execution_mode = "off"\n'
+        "myst_nb_json_render_cache = False\n"
+    )
+    outputs_size = max(1, size // NUM_NOTEBOOK_OUTPUTS)
+    notebook = nbformat.v4.new_notebook()
+    for _ in range(NUM_NOTEBOOK_OUTPUTS):
+        output = nbformat.v4.new_output(
+            "display_data", data={"application/json": generator(outputs_size)}
+        )
+        notebook.cells.append(nbformat.v4.new_code_cell("JSON(data)", outputs=[output]))
+    nbformat.write(notebook, source_dir / "index.ipynb")
+
+    def run() -> int:
+        build_dir = Path(tempfile.mkdtemp(dir=source_dir, prefix="_build"))
+        # Like sphinx-build, isolate the docutils registries of the build.
+        with patch_docutils(source_dir), docutils_namespace():
+            app = Sphinx(
+                source_dir,
+                source_dir,
+                build_dir / "html",
+                build_dir / "doctrees",
+                "html",
+                status=None,
+                warning=None,
+                freshenv=True,
+            )
+            app.build()
+        return (build_dir / "html" / "index.html").stat().st_size
+
+    return run
+
+
+CASES: dict[str, Callable[[Callable[[int], Any], int], Callable[[], int]]] = {
+    "html": bench_html,
+    "html_memo": bench_html_memo,
+    "html_compact": bench_html_compact,
+    "handle_mime": bench_handle_mime,
+    "sphinx_build": bench_sphinx_build,
+}
+
+
+def measure(run: Callable[[], int], repeat: int) -> dict[str, float]:
+    """
+    Measure a benchmark case
+
+    Args:
+        run: A function running the case once and returning the output size in bytes
+        repeat: How often to repeat the case for measuring the time
+
+    Returns:
+        The best time in seconds, the peak memory in bytes and the output size in bytes
+    """
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        output_bytes = run()
+        times.append(time.perf_counter() - start)
+    # Tracing memory slows down the execution, so it is measured in a separate run.
+    tracemalloc.start()
+    try:
+        run()
+        _, peak_memory = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {"seconds": min(times), "peak_memory": peak_memory, "output_bytes": output_bytes}
+
+
+def run_benchmarks(
+    size: int = DEFAULT_SIZE, repeat: int = DEFAULT_REPEAT, pattern: Optional[str] = None
+) -> dict[str, dict[str, float]]:
+    """
+    Run all benchmark cases for all generators
+
+    Args:
+        size: The approximate number of leaves of generated documents
+        repeat: How often to repeat every case for measuring the time
+        pattern: Only run cases whose name contains this string
+
+    Returns:
+        The results by case name
+    """
+    results = {}
+    for case_name, case in CASES.items():
+        for generator_name, generator in GENERATORS.items():
+            name = f"{case_name}/{generator_name}"
+            if pattern is not None and pattern not in name:
+                continue
+            results[name] = measure(case(generator, size), repeat=repeat)
+            print(format_result(name, results[name]), flush=True)
+    return results
+
+
+def format_result(name: str, result: dict[str, float]) -> str:
+    return (
+        f"{name:<30} {result['seconds'] * 1000:10.1f} ms"
+        f" {result['peak_memory'] / 1024**2:10.1f} MiB peak"
+        f" {result['output_bytes'] / 1024**2:10.1f} MiB output"
+    )
+
+
+def compare(
+    results: dict[str, dict[str, float]],
+    baseline: dict[str, dict[str, float]],
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> list[str]:
+    """
+    Compare results against a baseline
+
+    Args:
+        results: The current results
+        baseline: The results of a previous run
+        tolerance: The relative increase of time or peak memory that is considered a regression
+
+    Returns:
+        Descriptions of the regressions
+    """
+    regressions = []
+    for name, result in results.items():
+        if name not in baseline:
+            continue
+        for metric in ("seconds", "peak_memory"):
+            ratio = result[metric] / max(baseline[name][metric], 1e-9)
+            if ratio > 1 + tolerance:
+                regressions.append(f"{name}: {metric} increased by {ratio - 1:.0%}")
+    return regressions
+
+
+def main(args: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE, help="Leaves per document")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="Repeats per case")
+    parser.add_argument("--filter", help="Only run cases whose name contains this string")
+    parser.add_argument("--save", type=Path, help="Save the results to a JSON file")
+    parser.add_argument("--compare", type=Path, help="Compare to results from a JSON file")
+    parser.add_argument(
+        "--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed relative regression"
+    )
+    parsed = parser.parse_args(args)
+    results = run_benchmarks(size=parsed.size, repeat=parsed.repeat, pattern=parsed.filter)
+    if parsed.save:
+        parsed.save.write_text(json.dumps(results, indent=2))
+    if parsed.compare:
+        baseline = json.loads(parsed.compare.read_text())
+        regressions = compare(results, baseline, tolerance=parsed.tolerance)
+        for regression in regressions:
+            print(f"Regression: {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -22,7 +22,7 @@ release = version = metadata.version("myst-nb-json")
 
 # -- General configuration -------------------------------------------------------------------------
 
-extensions = ["myst_nb"]
+extensions = ["myst_nb", "myst_nb_json"]
 
 # List of glob-style patterns, relative to source directory, that match files and
 # directories to ignore when looking for source files.
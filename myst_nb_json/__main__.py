@@ -0,0 +1,163 @@
+"""
+Command line interface for rendering JSON files to standalone HTML pages
+
+Run with:
+
+    python -m myst_nb_json data.json other.json -o html/
+    cat data.json | python -m myst_nb_json > data.html
+
+Only the renderer core is imported, so that the start-up time stays small when rendering many
+files in separate processes.
+"""
+
+import argparse
+import html
+import json
+import sys
+from collections.abc import Sequence
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from myst_nb_json.core import CONFIG_DEFAULTS, RENDER_MODES, JsonRenderer, JsonType
+
+HTML_FILE_SUFFIX = ".html"
+
+_PAGE_START = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>{title}</title>
+</head>
+<body>
+"""
+_PAGE_END = """
+</body>
+</html>
+"""
+
+
+def _optional_int(text: str) -> Optional[int]:
+    if text.lower() == "none":
+        return None
+    value = int(text)
+    if value < 0:
+        raise argparse.ArgumentTypeError(f"must not be negative: {value}")
+    return value
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        prog="python -m myst_nb_json",
+        description="Render JSON files to standalone HTML pages.",
+    )
+    parser.add_argument(
+        "files",
+        nargs="*",
+        type=Path,
+        help="JSON files to render. Without files or with '-', JSON is read from stdin.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        help="Output file for stdin (default: stdout), or output directory for files "
+        "(default: next to each file)",
+    )
+    parser.add_argument("--root", default="root", help="Name to display as key for the root value")
+    parser.add_argument("--expanded", action="store_true", help="Render the tree expanded")
+    parser.add_argument("--compact", action="store_true", help="Render compact markup")
+    for name, default in CONFIG_DEFAULTS.items():
+        if name == "mode":
+            parser.add_argument("--mode", choices=RENDER_MODES, default=default)
+        else:
+            parser.add_argument(
+                f"--{name.replace('_', '-')}",
+                type=_optional_int,
+                default=default,
+                metavar="N",
+                help=f"(default: {default}, 'none' to disable)",
+            )
+    return parser.parse_args(argv)
+
+
+def render_page(
+    stream: IO[str], jsonable: JsonType, renderer: JsonRenderer, title: str, **options: Any
+) -> None:
+    """
+    Write a standalone HTML page for a JSON object
+
+    Args:
+        stream: A writable text stream
+        jsonable: A JSON-like Python object
+        renderer: A renderer which embeds the CSS and JavaScript
+        title: The title of the page
+        options: Options for rendering, see :meth:`myst_nb_json.core.JsonRenderer.component`
+    """
+    stream.write(_PAGE_START.format(title=html.escape(title)))
+    renderer.render_to(stream, jsonable, **options)
+    stream.write(_PAGE_END)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Render JSON files or stdin to standalone HTML pages
+
+    Files that cannot be read or parsed, or whose page would overwrite the page of a previous file,
+    are reported, and the other files are still rendered.
+
+    Args:
+        argv: The command line arguments, by default from sys.argv
+
+    Returns:
+        The exit status, 1 if any file failed
+    """
+    args = parse_args(argv)
+    renderer = JsonRenderer(inline_assets=True, compact=args.compact)
+    options = {
+        "root": args.root,
+        "expanded": args.expanded,
+        **{name: getattr(args, name) for name in CONFIG_DEFAULTS},
+    }
+    status = 0
+    if not args.files or args.files == [Path("-")]:
+        try:
+            jsonable = json.load(sys.stdin)
+        except ValueError as e:
+            print(f"myst_nb_json: cannot render stdin: {e}", file=sys.stderr)
+            return 1
+        if args.output is None:
+            render_page(sys.stdout, jsonable, renderer, title=args.root, **options)
+        else:
+            with open(args.output, "w", encoding="utf-8") as stream:
+                render_page(stream, jsonable, renderer, title=args.root, **options)
+        return status
+    if args.output is not None:
+        args.output.mkdir(parents=True, exist_ok=True)
+    # The input file of every output page, so that files with the same name in different
+    # directories do not overwrite each other's page in the output directory
+    sources: dict[Path, Path] = {}
+    for path in args.files:
+        directory = path.parent if args.output is None else args.output
+        output_path = directory / (path.stem + HTML_FILE_SUFFIX)
+        source = sources.setdefault(output_path.resolve(), path)
+        if source != path:
+            print(
+                f"myst_nb_json: cannot render {str(path)!r}: "
+                f"{str(output_path)!r} is already rendered from {str(source)!r}",
+                file=sys.stderr,
+            )
+            status = 1
+            continue
+        try:
+            with open(path, encoding="utf-8") as file:
+                jsonable = json.load(file)
+            with open(output_path, "w", encoding="utf-8") as stream:
+                render_page(stream, jsonable, renderer, title=path.name, **options)
+        except (OSError, ValueError) as e:
+            print(f"myst_nb_json: cannot render {str(path)!r}: {e}", file=sys.stderr)
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
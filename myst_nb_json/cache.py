@@ -0,0 +1,135 @@
+"""
+Content-addressed cache for rendered HTML, persisted across builds
+"""
+
+__all__ = ["RenderCache", "write_atomically"]
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+CACHE_FILE_SUFFIX = ".html"
+
+
+def write_atomically(path: Path, content: bytes) -> None:
+    """
+    Write a file atomically, since parallel processes may write the same file
+
+    The content is written to a temporary file in the same directory, which then replaces the file.
+
+    Args:
+        path: The path of the file
+        content: The content of the file
+    """
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(content)
+    os.replace(tmp_path, path)
+
+
+class RenderCache:
+    """
+    A cache of rendered HTML stored as files in a directory, keyed by a hash of the JSON content
+    and the render options
+
+    When the total size of the cached files exceeds the maximum size, the least recently used
+    files are removed.
+    """
+
+    def __init__(self, directory: os.PathLike, max_size: int):
+        """
+        Args:
+            directory: The directory where to store cached files
+            max_size: The maximum total size of cached files in bytes
+        """
+        self.directory = Path(directory)
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._size: Optional[int] = None
+
+    @staticmethod
+    def key(jsonable: Any, **options: Any) -> str:
+        """
+        Compute the cache key for a JSON object
+
+        Args:
+            jsonable: A JSON-like Python object
+            options: All options which affect the rendered HTML, including the renderer version
+
+        Returns:
+            A hash of the JSON object and the options
+        """
+        digest = hashlib.sha256()
+        # The order of object keys is preserved, since it affects the rendered HTML.
+        digest.update(json.dumps(jsonable, separators=(",", ":")).encode())
+        digest.update(json.dumps(options, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        Get cached HTML
+
+        Args:
+            key: The cache key
+
+        Returns:
+            The HTML, or None if it is not cached
+        """
+        path = self._path(key)
+        try:
+            html = path.read_text(encoding="utf-8")
+            # Mark as recently used.
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return html
+
+    def put(self, key: str, html: str) -> None:
+        """
+        Add HTML to the cache, and remove least recently used files if it exceeds its size
+
+        Args:
+            key: The cache key
+            html: The HTML
+        """
+        content = html.encode("utf-8")
+        if len(content) > self.max_size:
+            return
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomically(path, content)
+        with self._lock:
+            if self._size is None:
+                self._size = self._total_size()
+            else:
+                self._size += len(content)
+            if self._size > self.max_size:
+                self._size = self._evict()
+
+    def _path(self, key: str) -> Path:
+        return self.directory / key[:2] / (key + CACHE_FILE_SUFFIX)
+
+    def _entries(self) -> list[tuple[float, int, Path]]:
+        entries = []
+        for path in self.directory.glob(f"*/*{CACHE_FILE_SUFFIX}"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _total_size(self) -> int:
+        return sum(size for _, size, _ in self._entries())
+
+    def _evict(self) -> int:
+        entries = sorted(self._entries(), key=lambda entry: entry[0])
+        total_size = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total_size <= self.max_size:
+                break
+            path.unlink(missing_ok=True)
+            total_size -= size
+        return total_size
@@ -0,0 +1,1698 @@
+"""
+Renderer of JSON to HTML, without dependencies on MyST-NB, docutils or Sphinx
+
+This module only imports the standard library, so that it can be used from scripts and services
+without the import time of the documentation tools.
+"""
+
+__all__ = [
+    "CONFIG_DEFAULTS",
+    "BudgetExceededError",
+    "JsonRenderer",
+    "count_nodes",
+    "enforce_budget",
+    "format_scalar",
+    "json_stats",
+    "read_resource",
+    "search_index",
+    "truncated_json",
+    "write_fragments",
+]
+
+import html
+import json
+import math
+import sys
+import time
+from collections.abc import Generator, Iterable, Iterator, Mapping, Sequence
+from functools import cached_property, lru_cache
+from itertools import chain
+from json.encoder import encode_basestring_ascii
+from typing import IO, TYPE_CHECKING, Any, Optional, Union, cast
+
+from myst_nb_json.memo import RenderMemo
+from myst_nb_json.stream import END_ARRAY, END_MAP, MAP_KEY, START_ARRAY, START_MAP, VALUE
+
+if TYPE_CHECKING:
+    from concurrent.futures import ProcessPoolExecutor
+
+JAVASCRIPT_FILE_NAME = "myst-nb-json.js"
+CSS_FILE_NAME = "myst-nb-json.css"
+CLS_COMPONENT = "myst-nb-json"
+CLS_COMPACT = "myst-nb-json-compact"
+CLS_COLLAPSIBLE = "myst-nb-json-collapsible"
+CLS_COLLAPSED = "myst-nb-json-collapsed"
+CLS_HIDDEN = "myst-nb-json-hidden"
+CLS_KEY = "myst-nb-json-key"
+CLS_MORE = "myst-nb-json-more"
+CLS_NUMBERS = "myst-nb-json-numbers"
+CLS_SEARCH = "myst-nb-json-search"
+CLS_SUMMARY = "myst-nb-json-summary"
+CLS_SWITCH = "myst-nb-json-switch"
+CLS_TABLE = "myst-nb-json-table"
+CLS_UNSELECTABLE = "myst-nb-json-unselectable"
+CLS_VALUE = "myst-nb-json-value"
+CLS_VIRTUAL = "myst-nb-json-virtual"
+# Short class names of the elements repeated for every value in compact markup
+CLS_COMPACT_COLLAPSED = "c"
+CLS_COMPACT_KEY = "k"
+CLS_COMPACT_VALUE = "v"
+
+# Options that can be set globally in the Sphinx configuration (with prefix "myst_nb_json_") and
+# per output in the output metadata, with their default values
+CONFIG_DEFAULTS: dict[str, Any] = {
+    # Maximum number of items rendered per array or object
+    "max_items": None,
+    # Maximum nesting depth of rendered values below the root value
+    "max_depth": None,
+    # Maximum total number of rendered values
+    "max_nodes": None,
+    # Minimum number of items of an array of objects with the same keys to render it as table
+    "table_min_rows": None,
+    # Minimum number of items of a flat array of numbers to render it as summary
+    "summary_min_items": None,
+    # Whether to render the HTML at build time ("server"), or in the browser ("client")
+    "mode": "server",
+    # Minimum number of values of an output to add a search box for its keys and values
+    "search_min_nodes": None,
+    # Minimum number of items of an array or object to render only its visible items in the browser
+    "virtual_min_items": None,
+}
+
+RENDER_MODES = ("server", "client")
+
+# Number of characters to buffer before writing to a stream
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+# Minimum number of items of a root value to render it in parallel, if enabled
+DEFAULT_PARALLEL_MIN_ITEMS = 1000
+
+# Number of values shown at the start and at the end of a summarized array of numbers
+SUMMARY_EDGE_ITEMS = 5
+
+# Maximum number of characters of a string value in the search index
+MAX_INDEX_TEXT_LENGTH = 100
+
+# Number of fragments between checks of the time budget, since reading the clock for every fragment
+# would take longer than rendering most of them
+_BUDGET_CHECK_INTERVAL = 256
+
+# Number of values of a buffer to serialize at once
+_BUFFER_CHUNK_SIZE = 64 * 1024
+
+_INFINITY = float("inf")
+_MAX_FLOAT = sys.float_info.max
+
+_NUMBER_TYPES = frozenset((int, float))
+_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+# Formats of buffers (see the struct module) with integer or floating point numbers
+_NUMBER_FORMATS = frozenset("bBhHiIlLqQnNfd")
+
+# Kinds of JSON values, determining how they are rendered
+_SCALAR = 0
+_LIST = 1
+_DICT = 2
+_TABLE = 3
+_NUMBERS = 4
+
+# Categories of Python types, the part of the kind of a value that only depends on its type
+_SCALAR_TYPE = 0
+_SEQUENCE_TYPE = 1
+_MAPPING_TYPE = 2
+_OTHER_TYPE = 3
+# Categories by concrete type. Other types are checked against the abstract base classes on first
+# use, which is much slower than a dict lookup, and added.
+_TYPE_CATEGORIES: dict[type, int] = {
+    **dict.fromkeys(_SCALAR_TYPES, _SCALAR_TYPE),
+    list: _SEQUENCE_TYPE,
+    tuple: _SEQUENCE_TYPE,
+    dict: _MAPPING_TYPE,
+}
+
+ScalarJsonType = Union[str, int, float, bool, None]
+
+JsonType = Union[Mapping[str, "JsonType"], Sequence["JsonType"], ScalarJsonType]
+
+
+class BudgetExceededError(Exception):
+    """Raised when rendering a JSON object exceeds its time, node or size budget"""
+
+
+class JsonRenderer:
+    """Renderer of JSON-like Python objects to HTML, independent of MyST-NB"""
+
+    def __init__(
+        self,
+        inline_assets: bool = True,
+        workers: Optional[int] = None,
+        parallel_min_items: int = DEFAULT_PARALLEL_MIN_ITEMS,
+        compact: bool = False,
+    ):
+        """
+        Args:
+            inline_assets: Whether to embed the CSS and JavaScript into every component. Disable
+                this if the assets are already included in the page, like with the Sphinx extension.
+            workers: Number of processes for rendering the items of large root values in parallel,
+                or None to render in the current process
+            parallel_min_items: Minimum number of items of a root value to render it in parallel
+            compact: Whether to render compact markup, with short class names and without the
+                hidden punctuation that makes copied text valid JSON. Instead, copying is handled
+                by the JavaScript.
+        """
+        self.inline_assets = inline_assets
+        self.workers = workers
+        self.parallel_min_items = parallel_min_items
+        self.compact = compact
+        self.cls_component = f"{CLS_COMPONENT} {CLS_COMPACT}" if compact else CLS_COMPONENT
+        self.cls_value = CLS_COMPACT_VALUE if compact else CLS_VALUE
+
+    def html(
+        self,
+        jsonable: JsonType,
+        root: str = "root",
+        expanded: bool = False,
+        max_items: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        table_min_rows: Optional[int] = None,
+        summary_min_items: Optional[int] = None,
+        mode: str = "server",
+        memo: Optional[RenderMemo] = None,
+        search_min_nodes: Optional[int] = None,
+        virtual_min_items: Optional[int] = None,
+    ) -> str:
+        """
+        Generate an HTML string for a JSON object
+
+        Args:
+            jsonable: A JSON-like Python object
+            root: Optional name to display as key for the JSON value
+            expanded: Whether to initialize the JSON tree collapsed or expanded
+            max_items: Maximum number of items rendered per array or object
+            max_depth: Maximum nesting depth of rendered values below the root value
+            max_nodes: Maximum total number of rendered values
+            table_min_rows: Minimum number of items of an array of objects with the same keys to
+                render it as table, or None to always render arrays as tree
+            summary_min_items: Minimum number of items of a flat array of numbers to render it as
+                summary, or None to always render arrays as tree
+            mode: Whether to render the HTML here ("server"), or in the browser ("client")
+            memo: A memo table for reusing the HTML of repeated nested values
+            search_min_nodes: Minimum number of values to add a search box with an index of the
+                keys and values, or None to never add one
+            virtual_min_items: Minimum number of items of an array or object to render it as
+                virtual list in the browser, or None to never do so
+
+        Returns:
+            The component's HTML as string
+        """
+        return "".join(
+            self.component(
+                jsonable,
+                root=root,
+                expanded=expanded,
+                max_items=max_items,
+                max_depth=max_depth,
+                max_nodes=max_nodes,
+                table_min_rows=table_min_rows,
+                summary_min_items=summary_min_items,
+                mode=mode,
+                memo=memo,
+                search_min_nodes=search_min_nodes,
+                virtual_min_items=virtual_min_items,
+            )
+        )
+
+    def render_to(
+        self,
+        stream: IO[str],
+        jsonable: JsonType,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        **options: Any,
+    ) -> int:
+        """
+        Write the HTML for a JSON object to a stream, without building the full HTML string
+
+        Args:
+            stream: A writable text stream
+            jsonable: A JSON-like Python object
+            chunk_size: The number of characters to buffer before writing to the stream
+            options: Options for rendering, see :meth:`component`
+
+        Returns:
+            The number of written characters
+        """
+        return write_fragments(stream, self.component(jsonable, **options), chunk_size)
+
+    def component(
+        self,
+        jsonable: JsonType,
+        root: str = "root",
+        expanded: bool = False,
+        max_items: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        table_min_rows: Optional[int] = None,
+        summary_min_items: Optional[int] = None,
+        mode: str = "server",
+        memo: Optional[RenderMemo] = None,
+        search_min_nodes: Optional[int] = None,
+        virtual_min_items: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for a JSON object
+
+        Items exceeding one of the limits are not rendered, but embedded as compact JSON in a
+        placeholder, from which they can be rendered on demand in the browser.
+
+        In client mode, the JSON object is only embedded as compact JSON, and the browser renders
+        the expanded levels initially, and nested values when they are first expanded.
+
+        Arrays of objects with the same keys are rendered as table, with a header of the keys and
+        a row per object, which can be switched to the tree view in the browser. Long flat arrays
+        of numbers, also from objects supporting the buffer protocol like NumPy arrays, are
+        summarized by their first and last values and statistics, and all values are embedded to
+        show them in the browser.
+
+        With a memo table, nested values that occur more than once (also in previously rendered
+        JSON objects) are rendered only once. This does not change the HTML. The memo table is not
+        used with a maximum depth or number of nodes, since then the HTML of a nested value
+        depends on its position.
+
+        With a search box, the keys and scalar values are embedded as index, which the browser
+        searches without rendering, and only the path to a match is expanded.
+
+        Long arrays and objects can be rendered as virtual lists, whose items are embedded as
+        compact JSON. The browser renders them in a scrollable box, and only creates elements for
+        the items in or near its visible part.
+
+        Args:
+            jsonable: A JSON-like Python object
+            root: Optional name to display as key for the JSON value
+            expanded: Whether to initialize the JSON tree collapsed or expanded
+            max_items: Maximum number of items rendered per array or object
+            max_depth: Maximum nesting depth of rendered values below the root value
+            max_nodes: Maximum total number of rendered values
+            table_min_rows: Minimum number of items of an array of objects with the same keys to
+                render it as table, or None to always render arrays as tree
+            summary_min_items: Minimum number of items of a flat array of numbers to render it as
+                summary, or None to always render arrays as tree
+            mode: Whether to render the HTML here ("server"), or in the browser ("client")
+            memo: A memo table for reusing the HTML of repeated nested values
+            search_min_nodes: Minimum number of values to add a search box with an index of the
+                keys and values, or None to never add one
+            virtual_min_items: Minimum number of items of an array or object to render it as
+                virtual list in the browser, or None to never do so
+
+        Yields:
+            HTML strings
+        """
+        if mode not in RENDER_MODES:
+            raise ValueError(f"Invalid mode {mode!r}, expected one of {RENDER_MODES}")
+        if max_depth == 0:
+            table_min_rows = None
+        attributes = "" if max_items is None else f' data-max-items="{int(max_items)}"'
+        if virtual_min_items is not None:
+            attributes += f' data-virtual-min-items="{int(virtual_min_items)}"'
+        if mode == "client":
+            attributes += f' data-root="{html.escape(str(root))}"'
+            attributes += " data-expanded" if expanded else ""
+        yield f"""<div class="{self.cls_component}"{attributes}>"""
+        if search_min_nodes is not None:
+            # In client mode, arrays are always rendered as tree.
+            index = (
+                search_index(jsonable)
+                if mode == "client"
+                else search_index(
+                    jsonable,
+                    table_min_rows,
+                    summary_min_items,
+                    virtual_min_items,
+                    max_items=max_items,
+                    max_depth=max_depth,
+                    max_nodes=max_nodes,
+                )
+            )
+            if len(index["depths"]) >= search_min_nodes:
+                yield self.search_box(index)
+        if mode == "client":
+            yield self.payload(jsonable)
+        else:
+            kind = value_kind(jsonable, table_min_rows, summary_min_items)
+            yield f"""<div class="{self.cls_value}"><ul><li>"""
+            yield from self.key(root, collapsible=kind != _SCALAR, selectable=False)
+            if (
+                self.workers is not None
+                and self.workers > 1
+                and (kind == _LIST or kind == _DICT)
+                and len(cast(Sequence, jsonable)) >= self.parallel_min_items
+                and (virtual_min_items is None or len(cast(Sequence, jsonable)) < virtual_min_items)
+                # The number of nodes can only be counted when rendering in one process.
+                and max_nodes is None
+                and (max_depth is None or max_depth > 0)
+            ):
+                yield from self._walk_parallel(
+                    jsonable,
+                    kind,
+                    expanded=expanded,
+                    max_items=max_items,
+                    max_depth=max_depth,
+                    table_min_rows=table_min_rows,
+                    summary_min_items=summary_min_items,
+                    virtual_min_items=virtual_min_items,
+                )
+            else:
+                if memo is not None and max_depth is None and max_nodes is None:
+                    repeated = self._index(jsonable, memo)
+                else:
+                    memo = repeated = None
+                yield from self._walk(
+                    jsonable,
+                    kind,
+                    expanded=expanded,
+                    max_items=max_items,
+                    max_depth=max_depth,
+                    max_nodes=max_nodes,
+                    table_min_rows=table_min_rows,
+                    summary_min_items=summary_min_items,
+                    virtual_min_items=virtual_min_items,
+                    memo=memo,
+                    repeated=repeated,
+                )
+            yield "</li></ul></div>"
+        if self.inline_assets:
+            yield self.style
+            yield self.script
+        yield "</div>"
+
+    def stream_component(
+        self,
+        events: Iterable[tuple[str, Any]],
+        root: str = "root",
+        expanded: bool = False,
+        max_items: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for a JSON value given as parser events
+
+        The value is rendered event by event, without building it as Python object, so memory
+        does not grow with its size. Items exceeding one of the limits are skipped and only
+        counted, so their placeholders do not embed them and cannot be expanded. Arrays are always
+        rendered as tree, not as table or summary.
+
+        Args:
+            events: Events of a JSON value, see :func:`myst_nb_json.stream.iter_events`
+            root: Optional name to display as key for the JSON value
+            expanded: Whether to initialize the JSON tree collapsed or expanded
+            max_items: Maximum number of items rendered per array or object
+            max_depth: Maximum nesting depth of rendered values below the root value
+            max_nodes: Maximum total number of rendered values
+
+        Yields:
+            HTML strings
+
+        Raises:
+            ValueError: If the events end before the value is complete
+        """
+        events = _collapse_empty(events)
+        kind, value = next(events, (None, None))
+        if kind is None:
+            raise ValueError("No JSON value")
+        attributes = "" if max_items is None else f' data-max-items="{int(max_items)}"'
+        yield f"""<div class="{self.cls_component}"{attributes}>"""
+        yield f"""<div class="{self.cls_value}"><ul><li>"""
+        yield from self.key(root, collapsible=kind != VALUE, selectable=False)
+        # For every unfinished container: whether it is a mapping, the number of its children so
+        # far, whether its children are expanded, and the closing HTML fragment.
+        stack: list[list[Any]] = []
+        node_count = 0
+        # Whether the previous sibling is followed by a comma is only known with the next event,
+        # so the HTML after the comma's position is held back until then.
+        pending = ""
+        while True:
+            node_count += 1
+            if kind == VALUE:
+                yield f"""<span class="{self.cls_value}">{format_scalar(value)}</span>"""
+                pending = "</li>" if stack else ""
+            elif kind == START_MAP:
+                yield f"""<div class="{self.cls_value}">{self.curly_open}<ul>"""
+                stack.append([True, 0, expanded, f"</ul>{self.curly_close}"])
+            else:
+                yield f"""<div class="{self.cls_value}">{self.bracket_open}<ul>"""
+                stack.append([False, 0, expanded, f"</ul>{self.bracket_close}"])
+            # Only the direct children of the root value can be expanded.
+            expanded = False
+            # Continue with the next child of the innermost unfinished container.
+            while stack:
+                frame = stack[-1]
+                is_mapping, index, children_expanded, closing = frame
+                kind, value = next(events, (None, None))
+                if kind == END_MAP or kind == END_ARRAY:
+                    stack.pop()
+                    yield pending
+                    yield closing
+                    pending = "</div></li>" if stack else "</div>"
+                    continue
+                frame[1] += 1
+                if kind == MAP_KEY:
+                    key = cast(str, value)
+                    kind, value = next(events, (None, None))
+                if kind is None:
+                    raise ValueError("Unexpected end of JSON")
+                if (
+                    (max_items is not None and index >= max_items)
+                    or (max_depth is not None and len(stack) > max_depth)
+                    or (max_nodes is not None and node_count >= max_nodes)
+                ):
+                    # Skip this and all following children.
+                    count = _skip_items(events, kind)
+                    stack.pop()
+                    if index > 0:
+                        yield self.comma + pending
+                    yield from self.more(None, count=count, index=index, is_mapping=is_mapping)
+                    yield closing
+                    pending = "</div></li>" if stack else "</div>"
+                    continue
+                if index > 0:
+                    yield self.comma + pending
+                collapsed = kind != VALUE and not children_expanded
+                yield self.collapsed_item if collapsed else self.item
+                if is_mapping:
+                    yield from self.key(key, collapsible=kind != VALUE)
+                break
+            else:
+                break
+        yield pending
+        yield "</li></ul></div>"
+        if self.inline_assets:
+            yield self.style
+            yield self.script
+        yield "</div>"
+
+    def sidecar_component(
+        self,
+        name: str,
+        is_mapping: bool,
+        root: str = "root",
+        expanded: bool = False,
+        max_items: Optional[int] = None,
+        index: Optional[str] = None,
+        virtual_min_items: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for an array or object stored in a data file
+
+        Only the collapsed root key is rendered. When it is first expanded, the browser loads the
+        data file and renders the value like in client mode.
+
+        Args:
+            name: The name of the data file, see :func:`myst_nb_json.sidecar.write_sidecar`
+            is_mapping: Whether the value is an object
+            root: Optional name to display as key for the JSON value
+            expanded: Whether to initialize the value's children collapsed or expanded
+            max_items: Maximum number of items rendered at once per array or object
+            index: The name of the data file with the search index, to add a search box
+            virtual_min_items: Minimum number of items of an array or object to render it as
+                virtual list, or None to never do so
+
+        Yields:
+            HTML strings
+        """
+        attributes = "" if max_items is None else f' data-max-items="{int(max_items)}"'
+        if virtual_min_items is not None:
+            attributes += f' data-virtual-min-items="{int(virtual_min_items)}"'
+        attributes += " data-expanded" if expanded else ""
+        yield f"""<div class="{self.cls_component}"{attributes}>"""
+        if index is not None:
+            yield self.search_box(index)
+        yield f"""<div class="{self.cls_value}"><ul>{self.collapsed_item}"""
+        yield from self.key(root, collapsible=True, selectable=False)
+        opening, closing = (
+            (self.curly_open, self.curly_close)
+            if is_mapping
+            else (self.bracket_open, self.bracket_close)
+        )
+        yield f"""<div class="{self.cls_value}">{opening}<ul data-sidecar="{name}"></ul>"""
+        yield f"{closing}</div>"
+        yield "</li></ul></div>"
+        if self.inline_assets:
+            yield self.style
+            yield self.script
+        yield "</div>"
+
+    @cached_property
+    def script(self) -> str:
+        return f"<script defer>{read_resource(JAVASCRIPT_FILE_NAME)}</script>"
+
+    @cached_property
+    def style(self) -> str:
+        return f"""<style>{read_resource(CSS_FILE_NAME)}</style>"""
+
+    def value(
+        self, value: JsonType, expanded: bool = False, with_comma: bool = False
+    ) -> Generator[str, None, None]:
+        yield from self._walk(value, value_kind(value), expanded=expanded, with_comma=with_comma)
+
+    def key(
+        self, key: Union[str, int], collapsible: bool = False, selectable: bool = True
+    ) -> Generator[str, None, None]:
+        if self.compact:
+            # Only collapsible keys can be focused, which also marks them as collapsible.
+            classes = CLS_COMPACT_KEY if selectable else f"{CLS_COMPACT_KEY} {CLS_UNSELECTABLE}"
+            yield f"""<span class="{classes}"{' tabindex=0' if collapsible else ''}>{key}</span>"""
+            return
+        classes = CLS_KEY
+        if collapsible:
+            classes += " " + CLS_COLLAPSIBLE
+        if not selectable:
+            classes += " " + CLS_UNSELECTABLE
+        yield f"""<span class="{classes}" tabindex=0>{self.quote}{key}{self.quote}{self.colon}</span>"""
+
+    def list_value(
+        self, value: Sequence, expanded: bool = False, with_comma: bool = False
+    ) -> Generator[str, None, None]:
+        yield from self._walk(value, _LIST, expanded=expanded, with_comma=with_comma)
+
+    def dict_value(
+        self, value: Mapping, expanded: bool = False, with_comma: bool = False
+    ) -> Generator[str, None, None]:
+        yield from self._walk(value, _DICT, expanded=expanded, with_comma=with_comma)
+
+    def _walk(
+        self,
+        value: JsonType,
+        kind: int,
+        expanded: bool = False,
+        with_comma: bool = False,
+        max_items: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        max_nodes: Optional[int] = None,
+        table_min_rows: Optional[int] = None,
+        summary_min_items: Optional[int] = None,
+        virtual_min_items: Optional[int] = None,
+        memo: Optional[RenderMemo] = None,
+        repeated: Optional[dict[int, int]] = None,
+        capture: bool = True,
+    ) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for a JSON value and all its descendants
+
+        Instead of recursing for nested values, the containers that are currently being rendered
+        are kept on an explicit stack. This way, the Python stack does not grow with the nesting
+        depth, and deeply nested JSON does not hit the recursion limit.
+
+        Args:
+            value: A JSON-like Python object
+            kind: Whether to render the value as list, dict, table, numbers or scalar
+            expanded: Whether to initialize the value's children collapsed or expanded
+            with_comma: Whether to add a comma after the value
+            max_items: Maximum number of items rendered per array or object
+            max_depth: Maximum nesting depth of rendered values below the initial value
+            max_nodes: Maximum total number of rendered values
+            table_min_rows: Minimum number of items of an array of objects with the same keys to
+                render it as table
+            summary_min_items: Minimum number of items of a flat array of numbers to render it as
+                summary
+            virtual_min_items: Minimum number of items of an array or object to render it as
+                virtual list
+            memo: A memo table for reusing the HTML of repeated nested values
+            repeated: Ids of the structures of repeated nested values by their object ids, see
+                :meth:`_index`
+            capture: Whether to add the HTML of repeated nested values to the memo table. This is
+                disabled while rendering such a value for the memo table, which renders it
+                recursively, so that the recursion depth is bounded.
+        """
+        # For every unfinished container: Iterator over its remaining children, index of the last
+        # child, whether it is a mapping, whether its children are expanded, and the closing HTML
+        # fragment.
+        stack: list[tuple[Iterator, int, bool, bool, str]] = []
+        node_count = 0
+        while True:
+            node_count += 1
+            comma = self.comma if with_comma else ""
+            if (
+                virtual_min_items is not None
+                and (kind == _LIST or kind == _DICT)
+                and len(cast(Sequence, value)) >= virtual_min_items
+            ):
+                # All items are embedded, and the browser renders only the visible ones.
+                is_mapping = kind == _DICT
+                opening, closing = (
+                    (self.curly_open, self.curly_close)
+                    if is_mapping
+                    else (self.bracket_open, self.bracket_close)
+                )
+                attributes = f' class="{CLS_VIRTUAL}"' + (" data-expanded" if expanded else "")
+                yield f"""<div class="{self.cls_value}">{opening}<ul{attributes}>"""
+                yield from self.more(
+                    cast(Iterable[Any], cast(Mapping, value).items() if is_mapping else value),
+                    count=len(cast(Sequence, value)),
+                    is_mapping=is_mapping,
+                )
+                yield f"</ul>{closing}{comma}</div>"
+                if stack:
+                    yield "</li>"
+            elif kind == _LIST:
+                value = cast(Sequence, value)
+                yield f"""<div class="{self.cls_value}">{self.bracket_open}<ul>"""
+                closing = f"</ul>{self.bracket_close}{comma}</div>"
+                stack.append((enumerate(value), len(value) - 1, False, expanded, closing))
+            elif kind == _DICT:
+                value = cast(Mapping, value)
+                yield f"""<div class="{self.cls_value}">{self.curly_open}<ul>"""
+                closing = f"</ul>{self.curly_close}{comma}</div>"
+                stack.append((enumerate(value.items()), len(value) - 1, True, expanded, closing))
+            elif kind == _TABLE:
+                rows = cast(Sequence[Mapping[str, Any]], value)
+                max_rows = max_items
+                if max_nodes is not None:
+                    # Every row counts as the object and its values.
+                    max_rows = max(0, (max_nodes - node_count) // (len(rows[0]) + 1))
+                    if max_items is not None:
+                        max_rows = min(max_rows, max_items)
+                node_count += (len(rows) if max_rows is None else min(len(rows), max_rows)) * (
+                    len(rows[0]) + 1
+                )
+                yield from self.table(rows, with_comma=with_comma, max_rows=max_rows)
+                if stack:
+                    yield "</li>"
+            elif kind == _NUMBERS:
+                # The summary is also rendered beyond the maximum depth, since it is compact.
+                yield from self.numbers(value, with_comma=with_comma)
+                if stack:
+                    yield "</li>"
+            else:
+                # Same as scalar_value, but without the overhead of a nested generator
+                scalar = format_scalar(cast(ScalarJsonType, value))
+                yield f"""<span class="{self.cls_value}">{scalar}</span>{comma}"""
+                if stack:
+                    yield "</li>"
+            # Continue with the next child of the innermost unfinished container.
+            while stack:
+                children, last_index, is_mapping, children_expanded, closing = stack[-1]
+                child = next(children, None)
+                if child is None:
+                    stack.pop()
+                    yield closing
+                    if stack:
+                        yield "</li>"
+                    continue
+                index, item = child
+                if (
+                    (max_items is not None and index >= max_items)
+                    or (max_depth is not None and len(stack) > max_depth)
+                    or (max_nodes is not None and node_count >= max_nodes)
+                ):
+                    # Elide this and all following children.
+                    yield from self.more(
+                        chain([item], (item for _, item in children)),
+                        count=last_index - index + 1,
+                        index=index,
+                        is_mapping=is_mapping,
+                    )
+                    stack.pop()
+                    yield closing
+                    if stack:
+                        yield "</li>"
+                    continue
+                if is_mapping:
+                    key, value = item
+                else:
+                    value = item
+                # Most values are scalars of built-in types, which need no further checks.
+                if _TYPE_CATEGORIES.get(type(value)) == _SCALAR_TYPE:
+                    kind = _SCALAR
+                else:
+                    kind = value_kind(value, table_min_rows, summary_min_items)
+                if kind == _TABLE and max_depth is not None and len(stack) >= max_depth:
+                    # The rows would be deeper than the limit, so all items are elided.
+                    kind = _LIST
+                collapsed = kind != _SCALAR and not children_expanded
+                yield self.collapsed_item if collapsed else self.item
+                if is_mapping:
+                    yield from self.key(key, collapsible=kind != _SCALAR)
+                # It would be nicer to add the comma after the value here, but if value yields a
+                # block element, the comma would be an orphan in the next line below the value.
+                # To have it in the same line, it needs to be inside the value's block.
+                with_comma = index != last_index
+                # Only the direct children of the initial value can be expanded.
+                expanded = False
+                node_id = None if repeated is None else repeated.get(id(value))
+                if node_id is not None:
+                    # The HTML of a nested value only depends on its structure, besides the comma.
+                    memo_key = (
+                        node_id,
+                        max_items,
+                        table_min_rows,
+                        summary_min_items,
+                        virtual_min_items,
+                        self.compact,
+                    )
+                    fragment = cast(RenderMemo, memo).get(memo_key)
+                    if fragment is None and capture:
+                        fragment = "".join(
+                            self._walk(
+                                value,
+                                kind,
+                                max_items=max_items,
+                                table_min_rows=table_min_rows,
+                                summary_min_items=summary_min_items,
+                                virtual_min_items=virtual_min_items,
+                                memo=memo,
+                                repeated=repeated,
+                                capture=False,
+                            )
+                        )[: -len("</div>")]
+                        cast(RenderMemo, memo).put(memo_key, fragment)
+                    if fragment is not None:
+                        yield fragment
+                        if with_comma:
+                            yield self.comma
+                        yield "</div></li>"
+                        continue
+                break
+            else:
+                return
+
+    def _walk_parallel(
+        self,
+        value: JsonType,
+        kind: int,
+        expanded: bool = False,
+        max_items: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        table_min_rows: Optional[int] = None,
+        summary_min_items: Optional[int] = None,
+        virtual_min_items: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for an array or object, rendering its items in parallel
+
+        The items are split into contiguous chunks, which are rendered on a process pool and
+        joined in their original order. The result is identical to rendering in one process.
+
+        Args:
+            value: A non-empty array or object
+            kind: Whether to render the value as list or dict
+            expanded: Whether to initialize the value's children collapsed or expanded
+            max_items: Maximum number of items rendered per array or object
+            max_depth: Maximum nesting depth of rendered values below the initial value
+            table_min_rows: Minimum number of items of an array of objects with the same keys to
+                render it as table
+            summary_min_items: Minimum number of items of a flat array of numbers to render it as
+                summary
+            virtual_min_items: Minimum number of items of an array or object to render it as
+                virtual list
+        """
+        assert self.workers is not None
+        is_mapping = kind == _DICT
+        items = list(cast(Mapping, value).items()) if is_mapping else list(cast(Sequence, value))
+        rendered_items = items if max_items is None else items[:max_items]
+        # Create more chunks than workers to balance differently sized items.
+        chunk_size = max(1, -(-len(rendered_items) // (self.workers * 4)))
+        chunks = [
+            (
+                self,
+                rendered_items[start : start + chunk_size],
+                start,
+                len(items) - 1,
+                is_mapping,
+                expanded,
+                max_items,
+                max_depth,
+                table_min_rows,
+                summary_min_items,
+                virtual_min_items,
+            )
+            for start in range(0, len(rendered_items), chunk_size)
+        ]
+        if is_mapping:
+            yield f"""<div class="{self.cls_value}">{self.curly_open}<ul>"""
+        else:
+            yield f"""<div class="{self.cls_value}">{self.bracket_open}<ul>"""
+        yield from get_process_pool(self.workers).map(_render_items, *zip(*chunks))
+        if len(rendered_items) < len(items):
+            yield from self.more(
+                items[len(rendered_items) :],
+                count=len(items) - len(rendered_items),
+                index=len(rendered_items),
+                is_mapping=is_mapping,
+            )
+        if is_mapping:
+            yield f"</ul>{self.curly_close}</div>"
+        else:
+            yield f"</ul>{self.bracket_close}</div>"
+
+    def _items(
+        self,
+        items: Iterable,
+        start: int,
+        last_index: int,
+        is_mapping: bool,
+        expanded: bool = False,
+        max_items: Optional[int] = None,
+        max_depth: Optional[int] = None,
+        table_min_rows: Optional[int] = None,
+        summary_min_items: Optional[int] = None,
+        virtual_min_items: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for a range of items of an array or object
+
+        Args:
+            items: Array items, or (key, value) pairs of object items
+            start: The index of the first item in its array or object
+            last_index: The index of the last item in its array or object
+            is_mapping: Whether the items are object items
+            expanded: Whether to initialize the items collapsed or expanded
+            max_items: Maximum number of items rendered per array or object
+            max_depth: Maximum nesting depth of rendered values below the array or object
+            table_min_rows: Minimum number of items of an array of objects with the same keys to
+                render it as table
+            summary_min_items: Minimum number of items of a flat array of numbers to render it as
+                summary
+            virtual_min_items: Minimum number of items of an array or object to render it as
+                virtual list
+        """
+        child_max_depth = None if max_depth is None else max_depth - 1
+        for index, item in enumerate(items, start=start):
+            if is_mapping:
+                key, value = item
+            else:
+                value = item
+            kind = value_kind(
+                value, None if child_max_depth == 0 else table_min_rows, summary_min_items
+            )
+            collapsed = kind != _SCALAR and not expanded
+            yield self.collapsed_item if collapsed else self.item
+            if is_mapping:
+                yield from self.key(key, collapsible=kind != _SCALAR)
+            yield from self._walk(
+                value,
+                kind,
+                with_comma=index != last_index,
+                max_items=max_items,
+                max_depth=child_max_depth,
+                table_min_rows=table_min_rows,
+                summary_min_items=summary_min_items,
+                virtual_min_items=virtual_min_items,
+            )
+            yield "</li>"
+
+    def _index(self, jsonable: JsonType, memo: RenderMemo) -> dict[int, int]:
+        """
+        Intern the structures of all nested values below a JSON value
+
+        Args:
+            jsonable: A JSON-like Python object
+            memo: The memo table in which to intern the structures
+
+        Returns:
+            The ids of the structures of nested values which occurred more than once (also in
+            previously indexed values), by the object ids of the values
+        """
+        memo.trim()
+        kind = value_kind(jsonable)
+        if kind == _SCALAR:
+            return {}
+        node_ids: dict[int, int] = {}
+        # For every unfinished container: The container, whether it is a mapping, iterator over its
+        # remaining children, structures of its finished children, and its key in its parent.
+        stack: list[tuple[Any, bool, Iterator, list, Any]] = [
+            (jsonable, kind == _DICT, _iter_children(jsonable, kind), [], None)
+        ]
+        while stack:
+            container, is_mapping, children, parts, key = stack[-1]
+            for item in children:
+                if is_mapping:
+                    child_key, value = item
+                else:
+                    child_key, value = None, item
+                kind = value_kind(value)
+                if kind != _SCALAR:
+                    stack.append((value, kind == _DICT, _iter_children(value, kind), [], child_key))
+                    break
+                value_type = type(value)
+                # Unlike format_scalar, the type and value is faster to compute and hash for the
+                # most common types. The JSON of other types is distinct from them.
+                if value_type is str or value_type is int:
+                    part: Any = (value_type, value)
+                elif value_type in _SCALAR_TYPES:
+                    part = format_scalar(value)
+                else:
+                    # Other objects, like arrays of numbers, are never considered equal.
+                    part = (object, id(value))
+                parts.append((str(child_key), part) if is_mapping else part)
+            else:
+                stack.pop()
+                if not stack:
+                    # The root value is never reused.
+                    break
+                node_id = memo.intern((is_mapping, tuple(parts)))
+                node_ids[id(container)] = node_id
+                if stack[-1][1]:
+                    stack[-1][3].append((str(key), node_id))
+                else:
+                    stack[-1][3].append(node_id)
+        return {
+            object_id: node_id for object_id, node_id in node_ids.items() if memo.count(node_id) > 1
+        }
+
+    def table(
+        self, value: Sequence[Mapping], with_comma: bool = False, max_rows: Optional[int] = None
+    ) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for an array of objects with the same keys as table
+
+        The keys are rendered once in the header, and every object as a row of its values. Nested
+        values are rendered as JSON text. Rows beyond the limit are elided like array items.
+
+        Args:
+            value: A non-empty array of objects with the same keys
+            with_comma: Whether to add a comma after the value
+            max_rows: Maximum number of rendered rows
+        """
+        columns = list(value[0])
+        yield f"""<div class="{self.cls_value} {CLS_TABLE}">"""
+        yield f"""<span class="{CLS_SWITCH} {CLS_UNSELECTABLE}" tabindex=0>tree</span>"""
+        yield f"{self.bracket_open}<table><thead><tr>"
+        yield "".join(f"<th>{html.escape(str(column), quote=False)}</th>" for column in columns)
+        yield "</tr></thead><tbody>"
+        num_rows = len(value) if max_rows is None else min(len(value), max_rows)
+        for index in range(num_rows):
+            record = value[index]
+            yield "<tr>"
+            yield "".join(
+                f"""<td><span class="{self.cls_value}">{table_cell(record[column])}</span></td>"""
+                for column in columns
+            )
+            yield "</tr>"
+        if num_rows < len(value):
+            yield from self.more(
+                (value[index] for index in range(num_rows, len(value))),
+                count=len(value) - num_rows,
+                index=num_rows,
+                columns=len(columns),
+            )
+        yield f"</tbody></table>{self.bracket_close}{self.comma if with_comma else ''}</div>"
+
+    def numbers(self, value: Any, with_comma: bool = False) -> Generator[str, None, None]:
+        """
+        Yield HTML fragment strings for a flat array of numbers as summary
+
+        The first and last values are shown with the length and statistics of the array. All
+        values are embedded as compact JSON, to show them in the browser.
+
+        Args:
+            value: A list or tuple of numbers, or an object supporting the buffer protocol, see
+                :func:`numeric_values`
+            with_comma: Whether to add a comma after the value
+        """
+        values = cast(Sequence, numeric_values(value))
+        count = len(values)
+        minimum, maximum, mean = numeric_stats(value)
+        yield f"""<div class="{self.cls_value} {CLS_NUMBERS}">{self.bracket_open}"""
+        if count <= 2 * SUMMARY_EDGE_ITEMS:
+            yield f"""<span class="{self.cls_value}">{", ".join(map(format_scalar, values))}</span>"""
+        else:
+            head = ", ".join(map(format_scalar, values[:SUMMARY_EDGE_ITEMS]))
+            tail = ", ".join(map(format_scalar, values[-SUMMARY_EDGE_ITEMS:]))
+            label = f"{count - 2 * SUMMARY_EDGE_ITEMS} more items"
+            yield f"""<span class="{self.cls_value}">{head}, </span>"""
+            yield f"""<span class="{CLS_MORE}" data-kind="numbers">"""
+            yield f"""<span class="{CLS_UNSELECTABLE}" tabindex=0>… {label} …</span>"""
+            if isinstance(values, memoryview):
+                # Serialize in chunks, without converting the whole buffer to a list.
+                yield """<script type="application/json">["""
+                for start in range(0, count, _BUFFER_CHUNK_SIZE):
+                    chunk = values[start : start + _BUFFER_CHUNK_SIZE].tolist()
+                    chunk_json = json.dumps(chunk, separators=(",", ":"))[1:-1]
+                    yield ("," if start > 0 else "") + chunk_json
+                yield "]</script>"
+            else:
+                yield self.payload(values)
+            yield "</span>"
+            yield f"""<span class="{self.cls_value}">, {tail}</span>"""
+        yield self.bracket_close
+        summary = (
+            f"length {count}, min {format_scalar(minimum)}, max {format_scalar(maximum)},"
+            f" mean {format_number(mean)}"
+        )
+        yield f"""<span class="{CLS_SUMMARY} {CLS_UNSELECTABLE}">{summary}</span>"""
+        # The comma is last, like for the other kinds, so that the memo table can add it.
+        yield f"{self.comma if with_comma else ''}</div>"
+
+    def more(
+        self,
+        items: Optional[Iterable],
+        count: int,
+        index: int = 0,
+        is_mapping: bool = False,
+        columns: Optional[int] = None,
+    ) -> Generator[str, None, None]:
+        """
+        Yield a placeholder for elided items, which embeds them to render them in the browser
+
+        Args:
+            items: The elided array items, or (key, value) pairs of object items, or None to not
+                embed them
+            count: The number of elided items
+            index: The index of the first elided item in its array or object
+            is_mapping: Whether the items are object items
+            columns: The number of columns, if the items are rows of a table
+        """
+        label = f"{count} {'more ' if index > 0 else ''}item{'s' if count != 1 else ''}"
+        kind = "object" if is_mapping else "array"
+        if columns is None:
+            yield f"""<li class="{CLS_MORE}" data-kind="{kind}">"""
+        else:
+            yield f"""<tr class="{CLS_MORE}" data-kind="{kind}"><td colspan="{columns}">"""
+        if items is None:
+            yield f"""<span class="{CLS_UNSELECTABLE}">… {label}</span>"""
+        else:
+            yield f"""<span class="{CLS_UNSELECTABLE}" tabindex=0>… {label}</span>"""
+            # Object items are embedded as array of pairs, since parsing JSON objects in the
+            # browser does not preserve the order of integer-like keys.
+            yield self.payload(list(items))
+        yield "</li>" if columns is None else "</td></tr>"
+
+    def payload(self, jsonable: JsonType) -> str:
+        """
+        Embed a JSON object as compact JSON, to be rendered in the browser
+
+        Args:
+            jsonable: A JSON-like Python object
+
+        Returns:
+            A script element containing the JSON
+        """
+        payload = json.dumps(jsonable, separators=(",", ":"))
+        # Avoid the payload closing the script element early.
+        payload = payload.replace("<", "\\u003c")
+        return f"""<script type="application/json">{payload}</script>"""
+
+    def search_box(self, index: Union[Mapping[str, list], str]) -> str:
+        """
+        Render a search box for the keys and values of a JSON object
+
+        Args:
+            index: The search index, see :func:`search_index`, or the name of the data file it is
+                stored in, see :func:`myst_nb_json.sidecar.write_sidecar`
+
+        Returns:
+            The HTML of the search box, including the index if it is embedded
+        """
+        box = (
+            '<input type="search" placeholder="Search" aria-label="Search keys and values">'
+            f'<span class="{CLS_UNSELECTABLE}"></span>'
+        )
+        if isinstance(index, str):
+            return f"""<div class="{CLS_SEARCH}" data-sidecar="{index}">{box}</div>"""
+        return f"""<div class="{CLS_SEARCH}">{box}{self.payload(index)}</div>"""
+
+    def scalar_value(
+        self, value: ScalarJsonType, with_comma: bool = False
+    ) -> Generator[str, None, None]:
+        value_str = format_scalar(value)
+        yield f"""<span class="{self.cls_value}">{value_str}</span>{self.comma if with_comma else ''}"""
+
+    @cached_property
+    def item(self):
+        return "<li>" if self.compact else '<li class="">'
+
+    @cached_property
+    def collapsed_item(self):
+        return f"""<li class="{CLS_COMPACT_COLLAPSED if self.compact else CLS_COLLAPSED}">"""
+
+    @cached_property
+    def quote(self):
+        return "" if self.compact else f"""<span class="{CLS_HIDDEN}">"</span>"""
+
+    @cached_property
+    def colon(self):
+        return "" if self.compact else f"""<span class="{CLS_HIDDEN}">: </span>"""
+
+    @cached_property
+    def comma(self):
+        return "" if self.compact else f"""<span class="{CLS_HIDDEN}">, </span>"""
+
+    @cached_property
+    def curly_open(self):
+        return "" if self.compact else f"""<span class="{CLS_HIDDEN}">&lbrace;</span>"""
+
+    @cached_property
+    def curly_close(self):
+        return "" if self.compact else f"""<span class="{CLS_HIDDEN}">&rbrace;</span>"""
+
+    @cached_property
+    def bracket_open(self):
+        return "" if self.compact else f"""<span class="{CLS_HIDDEN}">&lbrack;</span>"""
+
+    @cached_property
+    def bracket_close(self):
+        return "" if self.compact else f"""<span class="{CLS_HIDDEN}">&rbrack;</span>"""
+
+
+def write_fragments(
+    stream: IO[str], fragments: Iterable[str], chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> int:
+    """
+    Write HTML fragments to a stream, in chunks of at least the chunk size
+
+    Args:
+        stream: A writable text stream
+        fragments: HTML fragments, for example from :meth:`JsonRenderer.component`
+        chunk_size: The number of characters to buffer before writing to the stream
+
+    Returns:
+        The number of written characters
+    """
+    buffer: list[str] = []
+    buffer_size = 0
+    total_size = 0
+    for fragment in fragments:
+        buffer.append(fragment)
+        buffer_size += len(fragment)
+        if buffer_size >= chunk_size:
+            stream.write("".join(buffer))
+            total_size += buffer_size
+            buffer.clear()
+            buffer_size = 0
+    stream.write("".join(buffer))
+    return total_size + buffer_size
+
+
+def enforce_budget(
+    fragments: Iterable[str],
+    max_seconds: Optional[float] = None,
+    max_size: Optional[int] = None,
+    start_time: Optional[float] = None,
+) -> Iterator[str]:
+    """
+    Pass HTML fragments through, and stop rendering them when exceeding a time or size budget
+
+    The time is checked between fragments, so a single expensive fragment, like the payload of a
+    huge array, is not interrupted.
+
+    Args:
+        fragments: HTML fragments, for example from :meth:`JsonRenderer.component`
+        max_seconds: Maximum time in seconds since the start time
+        max_size: Maximum number of characters of all fragments
+        start_time: The start time from time.perf_counter, by default when the first fragment is
+            requested
+
+    Yields:
+        The fragments
+
+    Raises:
+        BudgetExceededError: If a budget is exceeded
+    """
+    if start_time is None:
+        start_time = time.perf_counter()
+    deadline = _INFINITY if max_seconds is None else start_time + max_seconds
+    size_limit = _INFINITY if max_size is None else max_size
+    size = 0
+    for count, fragment in enumerate(fragments):
+        size += len(fragment)
+        if size > size_limit:
+            raise BudgetExceededError(f"its HTML is larger than {max_size} characters")
+        if count % _BUDGET_CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            raise BudgetExceededError(f"it took more than {max_seconds} s to render")
+        yield fragment
+
+
+# Process pools for rendering in parallel by their numbers of workers
+_process_pools: dict[int, "ProcessPoolExecutor"] = {}
+
+
+def get_process_pool(workers: int) -> "ProcessPoolExecutor":
+    """Get a process pool shared by all renderers with the same number of workers"""
+    pool = _process_pools.get(workers)
+    if pool is None:
+        # Imported here, since it imports multiprocessing.
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool = _process_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+    return pool
+
+
+def shutdown_process_pools() -> None:
+    """Shut down the process pools, so that their processes exit before the interpreter"""
+    while _process_pools:
+        _, pool = _process_pools.popitem()
+        pool.shutdown()
+
+
+def _render_items(plugin: "JsonRenderer", *args: Any) -> str:
+    # Module-level function, so that it can be pickled for the process pool.
+    return "".join(plugin._items(*args))
+
+
+@lru_cache(maxsize=None)
+def read_resource(file_name: str) -> str:
+    """Read a file from the package resources, only once per process"""
+    from importlib.resources import files
+
+    return (files(__package__) / "resources" / file_name).read_text()
+
+
+def format_scalar(value: ScalarJsonType) -> str:
+    """
+    Serialize a scalar value to JSON, like json.dumps, but faster for the built-in types
+
+    Args:
+        value: A scalar JSON value
+
+    Returns:
+        The JSON string
+    """
+    value_type = type(value)
+    if value_type is str:
+        return encode_basestring_ascii(cast(str, value))
+    elif value_type is int:
+        return int.__repr__(value)
+    elif value_type is float:
+        if value != value:
+            return "NaN"
+        elif value == _INFINITY:
+            return "Infinity"
+        elif value == -_INFINITY:
+            return "-Infinity"
+        return float.__repr__(value)
+    elif value is None:
+        return "null"
+    elif value is True:
+        return "true"
+    elif value is False:
+        return "false"
+    return json.dumps(value)
+
+
+def _iter_children(jsonable: JsonType, kind: int) -> Iterator:
+    return iter(cast(Mapping, jsonable).items() if kind == _DICT else cast(Sequence, jsonable))
+
+
+def _collapse_empty(events: Iterable[tuple[str, Any]]) -> Iterator[tuple[str, Any]]:
+    # Replace the events of empty arrays and objects by values, which are rendered as scalars.
+    started = None
+    for event in events:
+        if started is not None:
+            if event[0] == END_MAP or event[0] == END_ARRAY:
+                yield VALUE, {} if started[0] == START_MAP else []
+                started = None
+                continue
+            yield started
+            started = None
+        if event[0] == START_MAP or event[0] == START_ARRAY:
+            started = event
+        else:
+            yield event
+    if started is not None:
+        yield started
+
+
+def _skip_items(events: Iterator[tuple[str, Any]], kind: Optional[str]) -> int:
+    # Skip the events of a container's remaining items, the first of which is already started
+    # with an event of the given kind, up to and including the container's end. Returns the
+    # number of skipped items.
+    count = 1
+    depth = 0 if kind == VALUE else 1
+    for kind, _ in events:
+        if kind == START_MAP or kind == START_ARRAY:
+            count += depth == 0
+            depth += 1
+        elif kind == END_MAP or kind == END_ARRAY:
+            if depth == 0:
+                return count
+            depth -= 1
+        elif kind == VALUE:
+            count += depth == 0
+    raise ValueError("Unexpected end of JSON")
+
+
+def table_cell(value: JsonType) -> str:
+    """
+    Serialize a value of a table cell to JSON, escaped for HTML
+
+    Args:
+        value: A JSON-like Python object
+
+    Returns:
+        The JSON string, with nested values on one line
+    """
+    if isinstance(value, str):
+        return html.escape(encode_basestring_ascii(value), quote=False)
+    elif value_kind(value) != _SCALAR:
+        return html.escape(json.dumps(value), quote=False)
+    return format_scalar(cast(ScalarJsonType, value))
+
+
+def format_number(value: Union[int, float]) -> str:
+    """Format a number for display, with 6 significant digits"""
+    if value != value or value in (_INFINITY, -_INFINITY):
+        return format_scalar(value)
+    return f"{value:.6g}"
+
+
+def numeric_values(jsonable: Any) -> Optional[Sequence[Union[int, float]]]:
+    """
+    Get the values of a flat array of numbers
+
+    Lists and tuples must contain only int and float values, and the int values must be within the
+    range of float values, so that statistics can be computed. Objects supporting the buffer
+    protocol, like NumPy arrays or arrays of the array module, are read as a memoryview, without
+    converting them to a list.
+
+    Args:
+        jsonable: A JSON-like Python object, or an object supporting the buffer protocol
+
+    Returns:
+        The values, or None if the object is not a flat array of numbers
+    """
+    if isinstance(jsonable, (list, tuple)):
+        types = set(map(type, jsonable))
+        if not types <= _NUMBER_TYPES:
+            return None
+        if int in types and not all(
+            -_MAX_FLOAT <= value <= _MAX_FLOAT for value in jsonable if isinstance(value, int)
+        ):
+            return None
+        return jsonable
+    if isinstance(jsonable, (str, bytes, bytearray, Mapping)):
+        return None
+    try:
+        view = memoryview(jsonable)
+    except TypeError:
+        return None
+    if view.ndim != 1 or view.format.lstrip("@") not in _NUMBER_FORMATS:
+        return None
+    return view
+
+
+def numeric_stats(jsonable: Any) -> tuple[Union[int, float], Union[int, float], float]:
+    """
+    Compute the minimum, maximum and mean of a flat array of numbers
+
+    NumPy arrays are computed by NumPy. If any value is NaN, all statistics are NaN.
+
+    Args:
+        jsonable: A non-empty flat array of numbers, see :func:`numeric_values`
+
+    Returns:
+        The minimum, maximum and mean
+    """
+    if hasattr(jsonable, "__array_interface__") and hasattr(jsonable, "mean"):
+        minimum, maximum = jsonable.min().item(), jsonable.max().item()
+        mean = float(jsonable.mean())
+    else:
+        values = cast(Sequence, numeric_values(jsonable))
+        minimum, maximum = min(values), max(values)
+        try:
+            mean = sum(values) / len(values)
+        except OverflowError:
+            # The sum of large int values is not within the range of float values, but the mean is.
+            mean = math.fsum(value / len(values) for value in values)
+    if mean != mean and (minimum, maximum) != (-_INFINITY, _INFINITY):
+        # The mean is only NaN without NaN values if there are infinities of both signs.
+        return math.nan, math.nan, math.nan
+    return minimum, maximum, mean
+
+
+def type_category(value_type: type) -> int:
+    """Whether a type is rendered as scalar, sequence, mapping, or depending on the value"""
+    category = _TYPE_CATEGORIES.get(value_type)
+    if category is None:
+        if issubclass(value_type, str):
+            category = _SCALAR_TYPE
+        elif issubclass(value_type, Sequence):
+            category = _SEQUENCE_TYPE
+        elif issubclass(value_type, Mapping):
+            category = _MAPPING_TYPE
+        else:
+            category = _OTHER_TYPE
+        _TYPE_CATEGORIES[value_type] = category
+    return category
+
+
+def value_kind(
+    jsonable: JsonType,
+    table_min_rows: Optional[int] = None,
+    summary_min_items: Optional[int] = None,
+) -> int:
+    category = _TYPE_CATEGORIES.get(type(jsonable))
+    if category is None:
+        category = type_category(type(jsonable))
+    if category == _SCALAR_TYPE:
+        return _SCALAR
+    elif category == _SEQUENCE_TYPE and len(cast(Sequence, jsonable)) > 0:
+        jsonable = cast(Sequence, jsonable)
+        if (
+            summary_min_items is not None
+            and len(jsonable) >= summary_min_items
+            and numeric_values(jsonable) is not None
+        ):
+            return _NUMBERS
+        if (
+            table_min_rows is not None
+            and len(jsonable) >= table_min_rows
+            and is_table(cast(Sequence, jsonable))
+        ):
+            return _TABLE
+        return _LIST
+    elif category == _MAPPING_TYPE and len(cast(Mapping, jsonable)) > 0:
+        return _DICT
+    elif (
+        summary_min_items is not None
+        and (values := numeric_values(jsonable)) is not None
+        and len(values) >= max(summary_min_items, 1)
+    ):
+        return _NUMBERS
+    else:
+        return _SCALAR
+
+
+def is_nested(jsonable: JsonType) -> bool:
+    category = type_category(type(jsonable))
+    return (category == _SEQUENCE_TYPE or category == _MAPPING_TYPE) and len(
+        cast(Sequence, jsonable)
+    ) > 0
+
+
+def is_table(jsonable: Sequence) -> bool:
+    """Whether an array contains only non-empty objects with the same keys"""
+    first = jsonable[0]
+    if type_category(type(first)) != _MAPPING_TYPE or len(first) == 0:
+        return False
+    keys = first.keys()
+    return all(
+        type_category(type(item)) == _MAPPING_TYPE and item.keys() == keys for item in jsonable
+    )
+
+
+def json_stats(jsonable: JsonType) -> tuple[int, int]:
+    """
+    Count the values of a JSON object, and its nesting depth
+
+    Args:
+        jsonable: A JSON-like Python object
+
+    Returns:
+        The number of values including the object itself, and the maximum nesting depth of values
+        below it
+    """
+    num_nodes = 0
+    max_depth = 0
+    stack: list[tuple[JsonType, int]] = [(jsonable, 0)]
+    while stack:
+        value, depth = stack.pop()
+        num_nodes += 1
+        max_depth = max(max_depth, depth)
+        kind = value_kind(value)
+        if kind == _LIST:
+            stack.extend((item, depth + 1) for item in cast(Sequence, value))
+        elif kind == _DICT:
+            stack.extend((item, depth + 1) for item in cast(Mapping, value).values())
+    return num_nodes, max_depth
+
+
+def count_nodes(jsonable: JsonType, limit: Optional[int] = None) -> int:
+    """
+    Count the values of a JSON object, stopping early when exceeding a limit
+
+    Args:
+        jsonable: A JSON-like Python object
+        limit: The number of values after which to stop counting, or None to count all
+
+    Returns:
+        The number of values including the object itself, or limit + 1 if there are more
+    """
+    count = 0
+    stack: list[JsonType] = [jsonable]
+    while stack:
+        value = stack.pop()
+        count += 1
+        if limit is not None and count > limit:
+            break
+        kind = value_kind(value)
+        if kind == _LIST:
+            stack.extend(cast(Sequence, value))
+        elif kind == _DICT:
+            stack.extend(cast(Mapping, value).values())
+    return count
+
+
+def truncated_json(jsonable: Any, max_length: int) -> str:
+    """
+    Serialize a JSON object with indentation, truncated to a maximum length
+
+    Serialization stops at the maximum length, so this is fast also for huge objects. Objects that
+    are not JSON serializable are converted with str, and values nested too deeply to serialize are
+    cut off.
+
+    Args:
+        jsonable: A JSON-like Python object
+        max_length: The maximum number of characters, excluding the ellipsis marking truncation
+
+    Returns:
+        The JSON text, followed by an ellipsis if it was truncated
+    """
+    parts: list[str] = []
+    length = 0
+    truncated = False
+    try:
+        for part in json.JSONEncoder(indent=1, default=str).iterencode(jsonable):
+            parts.append(part)
+            length += len(part)
+            if length > max_length:
+                truncated = True
+                break
+    except (RecursionError, ValueError):
+        # Too deeply nested, or containing itself
+        truncated = True
+    text = "".join(parts)[:max_length]
+    return text + "\n…" if truncated else text
+
+
+def search_index(
+    jsonable: JsonType,
+    table_min_rows: Optional[int] = None,
+    summary_min_items: Optional[int] = None,
+    virtual_min_items: Optional[int] = None,
+    max_items: Optional[int] = None,
+    max_depth: Optional[int] = None,
+    max_nodes: Optional[int] = None,
+) -> dict[str, list]:
+    """
+    Build an index of the keys and scalar values of a JSON object, for searching it in the browser
+
+    Values are listed in the order in which they are rendered, with their nesting depth, from which
+    the browser reconstructs their paths. Long strings are truncated, and the items of arrays
+    summarized as numbers are not listed, since they are not rendered as tree.
+
+    Args:
+        jsonable: A JSON-like Python object
+        table_min_rows: Minimum number of rows of arrays rendered as table, like for rendering
+        summary_min_items: Minimum number of items of summarized arrays, like for rendering
+        virtual_min_items: Minimum number of items of virtual lists, like for rendering. Their
+            descendants are rendered in the browser, which renders arrays always as tree.
+        max_items: Maximum number of items rendered per array or object, like for rendering
+        max_depth: Maximum nesting depth of rendered values, like for rendering
+        max_nodes: Maximum total number of rendered values, like for rendering. Like the items of
+            virtual lists, the elided values are rendered in the browser.
+
+    Returns:
+        The index as lists of the depths, the keys (None for array items and the root value) and
+        the scalar values as text (None for arrays and objects) of all values
+    """
+    depths: list[int] = []
+    keys: list[Optional[str]] = []
+    values: list[Optional[str]] = []
+    # For every value: its key, its depth, whether it is rendered in the browser, and whether the
+    # limits apply to it, which they do not to the rows of tables
+    stack: list[tuple[JsonType, Optional[str], int, bool, bool]] = [
+        (jsonable, None, 0, False, True)
+    ]
+    node_count = 0
+    while stack:
+        value, key, depth, in_browser, limited = stack.pop()
+        depths.append(depth)
+        keys.append(key)
+        if limited and not in_browser:
+            if depth > 0 and (
+                (max_depth is not None and depth > max_depth)
+                or (max_nodes is not None and node_count >= max_nodes)
+            ):
+                # Elided values are rendered in the browser, like the items of virtual lists.
+                in_browser = True
+            else:
+                node_count += 1
+        kind = (
+            value_kind(value)
+            if in_browser
+            else value_kind(value, table_min_rows, summary_min_items)
+        )
+        if limited and kind == _TABLE and max_depth is not None and depth >= max_depth:
+            kind = _LIST
+        if (
+            virtual_min_items is not None
+            and (kind == _LIST or kind == _DICT)
+            and len(cast(Sequence, value)) >= virtual_min_items
+        ):
+            in_browser = True
+        # Items beyond the maximum number are elided.
+        max_children = max_items if limited and not in_browser else None
+        if kind == _LIST:
+            values.append(None)
+            stack.extend(
+                (
+                    item,
+                    None,
+                    depth + 1,
+                    in_browser or (max_children is not None and index >= max_children),
+                    limited,
+                )
+                for index, item in reversed(list(enumerate(cast(Sequence, value))))
+            )
+        elif kind == _TABLE:
+            values.append(None)
+            rows = cast(Sequence[Mapping[str, Any]], value)
+            columns = list(rows[0])
+            num_rows = len(rows)
+            if limited and not in_browser:
+                max_rows = max_items
+                if max_nodes is not None:
+                    # Every row counts as the object and its values, like for rendering.
+                    max_rows = max(0, (max_nodes - node_count) // (len(columns) + 1))
+                    if max_items is not None:
+                        max_rows = min(max_rows, max_items)
+                if max_rows is not None:
+                    num_rows = min(num_rows, max_rows)
+                node_count += num_rows * (len(columns) + 1)
+            # The tree view of a table lists the keys of every row in the order of the columns, and
+            # the browser renders the elided rows as tree.
+            stack.extend((row, None, depth + 1, True, False) for row in reversed(rows[num_rows:]))
+            stack.extend(
+                ({column: row[column] for column in columns}, None, depth + 1, in_browser, False)
+                for row in reversed(rows[:num_rows])
+            )
+        elif kind == _DICT:
+            values.append(None)
+            items = list(enumerate(cast(Mapping, value).items()))
+            stack.extend(
+                (
+                    item,
+                    str(name),
+                    depth + 1,
+                    in_browser or (max_children is not None and index >= max_children),
+                    limited,
+                )
+                for index, (name, item) in reversed(items)
+            )
+        elif kind == _NUMBERS:
+            values.append(None)
+        elif isinstance(value, str):
+            values.append(value[:MAX_INDEX_TEXT_LENGTH])
+        else:
+            values.append(format_scalar(cast(ScalarJsonType, value)))
+    return {"depths": depths, "keys": keys, "values": values}
@@ -0,0 +1,83 @@
+"""
+Directive for rendering JSON files, which are streamed from disk instead of loaded into memory
+"""
+
+__all__ = ["JsonViewDirective"]
+
+import os
+
+from docutils import nodes
+from docutils.parsers.rst import Directive, directives
+
+from myst_nb_json.core import CONFIG_DEFAULTS
+from myst_nb_json.plugin import get_plugin, is_extension_loaded
+from myst_nb_json.stream import iter_events, open_json
+
+_LIMITS = ("max_items", "max_depth", "max_nodes")
+
+
+class JsonViewDirective(Directive):
+    """
+    Render a JSON file as tree view
+
+    The file is memory-mapped and parsed incrementally, so that large files can be rendered with
+    bounded memory. The argument is the path of the file, relative to the document or, in Sphinx,
+    absolute paths relative to the source directory. Without limits, the HTML is as large as the
+    file, so large files should be rendered with ``max-items``, ``max-depth`` or ``max-nodes``.
+
+    Options:
+        root: Name to display as key for the JSON value
+        expanded: Initialize the JSON tree expanded
+        max-items: Maximum number of items rendered per array or object
+        max-depth: Maximum nesting depth of rendered values below the root value
+        max-nodes: Maximum total number of rendered values
+    """
+
+    required_arguments = 1
+    final_argument_whitespace = True
+    option_spec = {
+        "root": directives.unchanged,
+        "expanded": directives.flag,
+        "max-items": directives.nonnegative_int,
+        "max-depth": directives.nonnegative_int,
+        "max-nodes": directives.nonnegative_int,
+    }
+
+    def run(self) -> list[nodes.Node]:
+        env = getattr(self.state.document.settings, "env", None)
+        if env is not None:
+            rel_path, path = env.relfn2path(directives.path(self.arguments[0]))
+            env.note_dependency(rel_path)
+        else:
+            input_lines = self.state_machine.input_lines
+            if input_lines is None:
+                raise self.error("Cannot determine the source of the document")
+            source = input_lines.source(self.lineno - self.state_machine.input_offset - 1)
+            source_dir = os.path.dirname(os.path.abspath(source))
+            path = os.path.join(source_dir, directives.path(self.arguments[0]))
+        # When loaded as Sphinx extension, the limits default to the configuration.
+        is_extension = env is not None and is_extension_loaded(env)
+        limits = {
+            name: self.options.get(
+                name.replace("_", "-"),
+                env.config[f"myst_nb_json_{name}"] if is_extension else CONFIG_DEFAULTS[name],
+            )
+            for name in _LIMITS
+        }
+        if is_extension:
+            plugin = get_plugin(inline_assets=False, compact=env.config.myst_nb_json_compact)
+        else:
+            plugin = get_plugin(inline_assets=True)
+        try:
+            with open_json(path) as buffer:
+                html_str = "".join(
+                    plugin.stream_component(
+                        iter_events(buffer),
+                        root=self.options.get("root", "root"),
+                        expanded="expanded" in self.options,
+                        **limits,
+                    )
+                )
+        except (OSError, ValueError) as e:
+            raise self.warning(f"Cannot render JSON file {self.arguments[0]!r}: {e}")
+        return [nodes.raw(text=html_str, format="html")]
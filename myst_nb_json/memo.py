@@ -0,0 +1,94 @@
+"""
+Memo table for HTML fragments of repeated nested values, shared by the outputs of a document
+"""
+
+__all__ = ["RenderMemo"]
+
+from collections.abc import Hashable
+from typing import Optional
+
+DEFAULT_MAX_ENTRIES = 1_000_000
+
+
+class RenderMemo:
+    """
+    A bounded table of rendered HTML fragments, keyed by the structure of nested values
+
+    Every distinct structure is interned to an integer id, so that equal values get the same id,
+    and the structure of a container can refer to its children by their ids. Fragments of values
+    that occur more than once can then be rendered once and reused.
+
+    When the total length of the fragments exceeds the maximum size, the oldest fragments are
+    removed. When the number of interned structures exceeds the maximum number of entries, the
+    whole table is cleared before indexing the next value.
+    """
+
+    def __init__(self, max_size: int, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Args:
+            max_size: The maximum total number of characters of the fragments
+            max_entries: The maximum number of interned structures
+        """
+        self.max_size = max_size
+        self.max_entries = max_entries
+        self._ids: dict[Hashable, int] = {}
+        self._counts: list[int] = []
+        self._fragments: dict[Hashable, str] = {}
+        self._size = 0
+
+    def intern(self, structure: Hashable) -> int:
+        """
+        Get the id of a structure, and count its occurrence
+
+        Args:
+            structure: A hashable representation of a value, referring to nested values by their ids
+
+        Returns:
+            The id, which is the same for all equal structures
+        """
+        node_id = self._ids.setdefault(structure, len(self._ids))
+        if node_id == len(self._counts):
+            self._counts.append(1)
+        else:
+            self._counts[node_id] += 1
+        return node_id
+
+    def count(self, node_id: int) -> int:
+        """Get the number of occurrences of an interned structure"""
+        return self._counts[node_id]
+
+    def get(self, key: Hashable) -> Optional[str]:
+        """
+        Get a fragment
+
+        Args:
+            key: The id of the structure, and all options affecting the fragment
+
+        Returns:
+            The fragment, or None if it is not in the table
+        """
+        return self._fragments.get(key)
+
+    def put(self, key: Hashable, fragment: str) -> None:
+        """
+        Add a fragment, and remove the oldest ones if the table exceeds its size
+
+        Args:
+            key: The id of the structure, and all options affecting the fragment
+            fragment: The HTML fragment
+        """
+        if len(fragment) > self.max_size or key in self._fragments:
+            return
+        self._fragments[key] = fragment
+        self._size += len(fragment)
+        while self._size > self.max_size:
+            oldest = next(iter(self._fragments))
+            self._size -= len(self._fragments.pop(oldest))
+
+    def trim(self) -> None:
+        """Clear the table if it has too many interned structures, which invalidates their ids"""
+        if len(self._ids) > self.max_entries:
+            self._ids.clear()
+            self._counts.clear()
+            self._fragments.clear()
+            self._size = 0
@@ -0,0 +1,509 @@
+"""
+MimeRenderPlugin for MyST-NB and Sphinx extension for rendering IPython JSON display type to HTML
+"""
+
+__all__ = ["JsonMimeRenderPlugin", "get_plugin", "setup"]
+
+import json
+import time
+from collections import Counter
+from collections.abc import Mapping
+from functools import lru_cache
+from importlib.resources import files
+from pathlib import Path
+from tempfile import SpooledTemporaryFile
+from typing import TYPE_CHECKING, Any, Optional, Union
+
+from docutils import nodes
+from myst_nb.core.render import MimeData, MimeRenderPlugin, NbElementRenderer
+
+from myst_nb_json import __version__
+from myst_nb_json.cache import RenderCache
+from myst_nb_json.core import (
+    CONFIG_DEFAULTS,
+    CSS_FILE_NAME,
+    DEFAULT_PARALLEL_MIN_ITEMS,
+    JAVASCRIPT_FILE_NAME,
+    BudgetExceededError,
+    JsonRenderer,
+    count_nodes,
+    enforce_budget,
+    is_nested,
+    json_stats,
+    search_index,
+    shutdown_process_pools,
+    truncated_json,
+    write_fragments,
+)
+from myst_nb_json.memo import RenderMemo
+from myst_nb_json.sidecar import SIDECAR_DIRECTORY, copy_sidecars, write_sidecar
+
+if TYPE_CHECKING:
+    from sphinx.application import Sphinx
+    from sphinx.environment import BuildEnvironment
+
+# Name of the Sphinx extension, also the prefix of its configuration values
+EXTENSION_NAME = "myst_nb_json"
+
+# Attributes of the Sphinx build environment holding the state of the extension
+_CACHE_STATS_ATTRIBUTE = "myst_nb_json_cache_stats"
+_METRICS_ATTRIBUTE = "myst_nb_json_metrics"
+_SIDECARS_ATTRIBUTE = "myst_nb_json_sidecars"
+
+# Budgets per output, which can also be set in the output metadata. When a budget is exceeded, the
+# output falls back to plain text, or to the next MIME type of the output ("next").
+BUDGET_DEFAULTS: dict[str, Any] = {
+    "budget_seconds": None,
+    "budget_nodes": None,
+    "budget_bytes": None,
+    "budget_fallback": "text",
+}
+BUDGET_FALLBACKS = ("text", "next")
+# Maximum number of characters of the JSON text displayed as fallback
+FALLBACK_TEXT_LENGTH = 10_000
+
+
+class JsonMimeRenderPlugin(JsonRenderer, MimeRenderPlugin):
+    mime_priority_overrides = [("*", "application/json", 1)]
+
+    @staticmethod
+    def handle_mime(
+        renderer: NbElementRenderer, data: MimeData, inline: bool
+    ) -> Union[None, list[nodes.Element]]:
+        """
+        A function that renders a mime type to docutils nodes, or returns None to reject
+
+        Args:
+            renderer: A class for rendering notebook elements
+            data: The Notebook output data
+            inline: Whether the MIME type is displayed inline, e.g. in an interactive Jupyter
+                notebook. In the context of MyST-NB, content is rendered to a file, so the renderer
+                should not accept inline content.
+
+        Returns:
+            A list of docutils nodes, or None if this renderer cannot handle the data
+        """
+        budgets = BUDGET_DEFAULTS
+        try:
+            if not inline and data.mime_type == "application/json":
+                start_time = time.perf_counter()
+                metadata = data.output_metadata.get(data.mime_type, {})
+                # When loaded as Sphinx extension, CSS and JavaScript are added once per page as
+                # static files. Otherwise (e.g. docutils), each output must embed them.
+                env = renderer.renderer.sphinx_env
+                is_extension = env is not None and is_extension_loaded(env)
+                if is_extension:
+                    config = {
+                        name: env.config[f"{EXTENSION_NAME}_{name}"] for name in CONFIG_DEFAULTS
+                    }
+                    budgets = {
+                        name: env.config[f"{EXTENSION_NAME}_{name}"] for name in BUDGET_DEFAULTS
+                    }
+                    plugin = get_plugin(
+                        inline_assets=False,
+                        workers=env.config.myst_nb_json_parallel_workers,
+                        parallel_min_items=env.config.myst_nb_json_parallel_min_items,
+                        compact=env.config.myst_nb_json_compact,
+                    )
+                    cache = get_render_cache(env)
+                    spool_size = env.config.myst_nb_json_spool_size
+                    memo = get_render_memo(renderer.source, env.config.myst_nb_json_memo_size)
+                else:
+                    config = dict(CONFIG_DEFAULTS)
+                    plugin = get_plugin(inline_assets=True)
+                    cache = None
+                    spool_size = None
+                    memo = None
+                config.update({k: v for k, v in metadata.items() if k in CONFIG_DEFAULTS})
+                budgets = {**budgets, **{k: v for k, v in metadata.items() if k in BUDGET_DEFAULTS}}
+                if budgets["budget_fallback"] not in BUDGET_FALLBACKS:
+                    raise ValueError(
+                        f"Invalid budget_fallback {budgets['budget_fallback']!r}, "
+                        f"expected one of {BUDGET_FALLBACKS}"
+                    )
+                max_nodes = budgets["budget_nodes"]
+                if max_nodes is not None and count_nodes(data.content, max_nodes) > max_nodes:
+                    raise BudgetExceededError(f"it has more than {max_nodes} values")
+                options = {
+                    "root": metadata.get("root", "root"),
+                    "expanded": metadata.get("expanded", True),
+                    **config,
+                }
+                html_str = None
+                cached = False
+                sidecar_size = env.config.myst_nb_json_sidecar_size if is_extension else None
+                if sidecar_size is not None and is_nested(data.content):
+                    # ASCII only, so the length is the size in bytes
+                    json_text = json.dumps(data.content, separators=(",", ":"))
+                    if len(json_text) >= sidecar_size:
+                        directory = get_sidecar_directory(env)
+                        names = _sidecars(env).setdefault(env.docname, set())
+                        name = write_sidecar(directory, json_text)
+                        names.add(name)
+                        index_name = None
+                        if options["search_min_nodes"] is not None:
+                            index = search_index(data.content)
+                            if len(index["depths"]) >= options["search_min_nodes"]:
+                                index_json = json.dumps(index, separators=(",", ":"))
+                                index_name = write_sidecar(directory, index_json)
+                                names.add(index_name)
+                        html_str = "".join(
+                            plugin.sidecar_component(
+                                name,
+                                is_mapping=isinstance(data.content, Mapping),
+                                root=options["root"],
+                                expanded=options["expanded"],
+                                max_items=options["max_items"],
+                                index=index_name,
+                                virtual_min_items=options["virtual_min_items"],
+                            )
+                        )
+                if html_str is None and cache is not None:
+                    key = cache.key(
+                        data.content,
+                        inline_assets=plugin.inline_assets,
+                        compact=plugin.compact,
+                        version=__version__,
+                        budget_seconds=budgets["budget_seconds"],
+                        budget_bytes=budgets["budget_bytes"],
+                        **options,
+                    )
+                    html_str = cache.get(key)
+                    cached = html_str is not None
+                    _cache_stats(env)["hits" if cached else "misses"] += 1
+                if html_str is None:
+                    fragments = enforce_budget(
+                        plugin.component(data.content, memo=memo, **options),
+                        max_seconds=budgets["budget_seconds"],
+                        max_size=budgets["budget_bytes"],
+                        start_time=start_time,
+                    )
+                    if spool_size is None:
+                        html_str = "".join(fragments)
+                    else:
+                        # Avoid holding all HTML fragments in memory besides the joined HTML.
+                        with SpooledTemporaryFile(
+                            max_size=spool_size, mode="w+", encoding="utf-8"
+                        ) as buffer:
+                            write_fragments(buffer, fragments)
+                            buffer.seek(0)
+                            html_str = buffer.read()
+                    if cache is not None:
+                        cache.put(key, html_str)
+                if is_extension:
+                    _record_metrics(
+                        renderer,
+                        env,
+                        data,
+                        seconds=time.perf_counter() - start_time,
+                        size=len(html_str.encode("utf-8")),
+                        cached=cached,
+                    )
+                return [nodes.raw(text=html_str, format="html", classes=["output", "text_html"])]
+        except BudgetExceededError as e:
+            renderer.logger.warning(
+                f"JSON output exceeds its render budget, since {e}; "
+                f"falling back to {_FALLBACK_DESCRIPTIONS[budgets['budget_fallback']]}",
+                subtype="json_budget",
+                line=data.line,
+            )
+            return _fallback(renderer, data, budgets["budget_fallback"])
+        except Exception as e:
+            import traceback
+
+            renderer.logger.warning(
+                f"Failed to render JSON output: {e}", subtype="json", line=data.line
+            )
+            renderer.logger.debug(traceback.format_exc())
+        return None
+
+
+_FALLBACK_DESCRIPTIONS = {"text": "plain text", "next": "the next MIME type"}
+
+
+def _fallback(renderer: NbElementRenderer, data: MimeData, fallback: str) -> list[nodes.Element]:
+    # With Sphinx, every MIME type of an output is rendered, and empty ones are removed before the
+    # one with the highest priority is selected. With docutils, only one MIME type is rendered, so
+    # there is no next one to fall back to.
+    if fallback == "next" and renderer.renderer.sphinx_env is not None:
+        return []
+    text = truncated_json(data.content, FALLBACK_TEXT_LENGTH)
+    return [nodes.literal_block(text, text, language="none", classes=["output", "text_plain"])]
+
+
+@lru_cache(maxsize=None)
+def get_plugin(
+    inline_assets: bool = True,
+    workers: Optional[int] = None,
+    parallel_min_items: int = DEFAULT_PARALLEL_MIN_ITEMS,
+    compact: bool = False,
+) -> JsonMimeRenderPlugin:
+    """
+    Get a renderer instance shared by all outputs with the same configuration
+
+    The renderer is stateless after initialization, so one instance can be reused (also from
+    multiple threads) and its fragments are computed only once per process.
+
+    Args:
+        inline_assets: Whether to embed the CSS and JavaScript into every component
+        workers: Number of processes for rendering the items of large root values in parallel,
+            or None to render in the current process
+        parallel_min_items: Minimum number of items of a root value to render it in parallel
+        compact: Whether to render compact markup
+
+    Returns:
+        The shared renderer instance
+    """
+    return JsonMimeRenderPlugin(
+        inline_assets=inline_assets,
+        workers=workers,
+        parallel_min_items=parallel_min_items,
+        compact=compact,
+    )
+
+
+def is_extension_loaded(env: "BuildEnvironment") -> bool:
+    app = getattr(env, "_app", None) or env.app
+    return EXTENSION_NAME in app.extensions
+
+
+def get_render_cache(env: "BuildEnvironment") -> Optional[RenderCache]:
+    """
+    Get the render cache of a Sphinx build, if enabled
+
+    Args:
+        env: The Sphinx build environment
+
+    Returns:
+        The render cache, or None if it is disabled
+    """
+    if not env.config.myst_nb_json_render_cache:
+        return None
+    return _get_render_cache(
+        Path(env.doctreedir) / "myst-nb-json-cache", env.config.myst_nb_json_render_cache_size
+    )
+
+
+@lru_cache(maxsize=None)
+def _get_render_cache(directory: Path, max_size: int) -> RenderCache:
+    return RenderCache(directory, max_size=max_size)
+
+
+def get_sidecar_directory(env: "BuildEnvironment") -> Path:
+    """Get the directory where data files of large outputs are written while reading documents"""
+    return Path(env.doctreedir) / "myst-nb-json-sidecars"
+
+
+@lru_cache(maxsize=1)
+def get_render_memo(source: str, max_size: Optional[int]) -> Optional[RenderMemo]:
+    """
+    Get the memo table shared by the outputs of a document, if enabled
+
+    Documents are read one after another, so only the memo table of the current document is kept.
+
+    Args:
+        source: The path of the document
+        max_size: The maximum total number of characters of memoized HTML, or None to disable
+
+    Returns:
+        The memo table, or None if it is disabled
+    """
+    if max_size is None:
+        return None
+    return RenderMemo(max_size)
+
+
+def _record_metrics(
+    renderer: NbElementRenderer,
+    env: "BuildEnvironment",
+    data: MimeData,
+    seconds: float,
+    size: int,
+    cached: bool,
+) -> None:
+    # Warn about outputs exceeding a budget, and record metrics for the report of the build.
+    config = env.config
+    if config.myst_nb_json_warn_seconds is not None and seconds > config.myst_nb_json_warn_seconds:
+        renderer.logger.warning(
+            f"JSON output took {seconds:.2f} s to render, more than "
+            f"myst_nb_json_warn_seconds ({config.myst_nb_json_warn_seconds} s)",
+            subtype="json_budget",
+            line=data.line,
+        )
+    if config.myst_nb_json_warn_bytes is not None and size > config.myst_nb_json_warn_bytes:
+        renderer.logger.warning(
+            f"JSON output has {size} bytes of HTML, more than "
+            f"myst_nb_json_warn_bytes ({config.myst_nb_json_warn_bytes})",
+            subtype="json_budget",
+            line=data.line,
+        )
+    if not config.myst_nb_json_report_top and not config.myst_nb_json_report_file:
+        return
+    num_nodes, depth = json_stats(data.content)
+    metrics = {
+        "docname": env.docname,
+        "line": data.line,
+        "nodes": num_nodes,
+        "depth": depth,
+        "seconds": seconds,
+        "bytes": size,
+        "cached": cached,
+    }
+    renderer.logger.debug(f"JSON output: {metrics}")
+    _metrics(env).append(metrics)
+
+
+def setup(app: "Sphinx") -> dict[str, Any]:
+    """
+    Set up the Sphinx extension
+
+    The MIME type plugin also works without the extension, but then every JSON output embeds its
+    own copy of the CSS and JavaScript. As extension, they are added only once per page.
+
+    Args:
+        app: The Sphinx application
+
+    Returns:
+        The extension metadata
+    """
+    from myst_nb_json.directive import JsonViewDirective
+
+    app.setup_extension("myst_nb")
+    for name, default in CONFIG_DEFAULTS.items():
+        app.add_config_value(f"{EXTENSION_NAME}_{name}", default, "env")
+    app.add_config_value("myst_nb_json_render_cache", True, "env")
+    app.add_config_value("myst_nb_json_render_cache_size", 256 * 1024**2, "env")
+    app.add_config_value("myst_nb_json_spool_size", None, "env")
+    app.add_config_value("myst_nb_json_parallel_workers", None, "env")
+    app.add_config_value("myst_nb_json_parallel_min_items", DEFAULT_PARALLEL_MIN_ITEMS, "env")
+    app.add_config_value("myst_nb_json_memo_size", None, "env")
+    app.add_config_value("myst_nb_json_compact", False, "env")
+    app.add_config_value("myst_nb_json_sidecar_size", None, "env")
+    for name, default in BUDGET_DEFAULTS.items():
+        app.add_config_value(f"{EXTENSION_NAME}_{name}", default, "env")
+    app.add_config_value("myst_nb_json_report_top", 0, "")
+    app.add_config_value("myst_nb_json_report_file", None, "")
+    app.add_config_value("myst_nb_json_warn_seconds", None, "")
+    app.add_config_value("myst_nb_json_warn_bytes", None, "")
+    app.connect("builder-inited", _add_static_path)
+    app.connect("env-before-read-docs", _reset_stats)
+    app.connect("env-merge-info", _merge_stats)
+    app.connect("env-before-read-docs", _init_sidecars)
+    app.connect("env-purge-doc", _purge_sidecars)
+    app.connect("env-merge-info", _merge_sidecars)
+    app.connect("build-finished", _copy_sidecars)
+    app.connect("build-finished", _report_cache_stats)
+    app.connect("build-finished", _report_metrics)
+    app.connect("build-finished", _shutdown_process_pools)
+    app.add_directive("json-view", JsonViewDirective)
+    app.add_css_file(CSS_FILE_NAME)
+    app.add_js_file(JAVASCRIPT_FILE_NAME, loading_method="defer")
+    return {"version": __version__, "parallel_read_safe": True, "parallel_write_safe": True}
+
+
+def _add_static_path(app: "Sphinx") -> None:
+    static_path = str(files(__package__) / "resources")
+    if static_path not in app.config.html_static_path:
+        app.config.html_static_path.append(static_path)
+
+
+def _cache_stats(env: "BuildEnvironment") -> "Counter[str]":
+    # The numbers of render cache hits and misses of the build. Like all state of the extension,
+    # it is an attribute of the environment, so that it is merged from parallel processes.
+    if not hasattr(env, _CACHE_STATS_ATTRIBUTE):
+        setattr(env, _CACHE_STATS_ATTRIBUTE, Counter())
+    return getattr(env, _CACHE_STATS_ATTRIBUTE)
+
+
+def _metrics(env: "BuildEnvironment") -> list[dict[str, Any]]:
+    # The metrics of the outputs rendered in the build
+    if not hasattr(env, _METRICS_ATTRIBUTE):
+        setattr(env, _METRICS_ATTRIBUTE, [])
+    return getattr(env, _METRICS_ATTRIBUTE)
+
+
+def _reset_stats(app: "Sphinx", env: "BuildEnvironment", docnames: list[str]) -> None:
+    setattr(env, _CACHE_STATS_ATTRIBUTE, Counter())
+    setattr(env, _METRICS_ATTRIBUTE, [])
+
+
+def _merge_stats(
+    app: "Sphinx", env: "BuildEnvironment", docnames: set[str], other: "BuildEnvironment"
+) -> None:
+    # Outputs rendered in parallel processes are counted in their environments.
+    _cache_stats(env).update(_cache_stats(other))
+    _metrics(env).extend(_metrics(other))
+
+
+def _sidecars(env: "BuildEnvironment") -> dict[str, set[str]]:
+    # The names of the data files used by every document, kept for documents that are not re-read
+    if not hasattr(env, _SIDECARS_ATTRIBUTE):
+        setattr(env, _SIDECARS_ATTRIBUTE, {})
+    return getattr(env, _SIDECARS_ATTRIBUTE)
+
+
+def _init_sidecars(app: "Sphinx", env: "BuildEnvironment", docnames: list[str]) -> None:
+    _sidecars(env)
+
+
+def _purge_sidecars(app: "Sphinx", env: "BuildEnvironment", docname: str) -> None:
+    _sidecars(env).pop(docname, None)
+
+
+def _merge_sidecars(
+    app: "Sphinx", env: "BuildEnvironment", docnames: set[str], other: "BuildEnvironment"
+) -> None:
+    sidecars, other_sidecars = _sidecars(env), _sidecars(other)
+    for docname in docnames:
+        if docname in other_sidecars:
+            sidecars[docname] = other_sidecars[docname]
+
+
+def _copy_sidecars(app: "Sphinx", exception: Optional[Exception]) -> None:
+    sidecars = getattr(app.env, _SIDECARS_ATTRIBUTE, None)
+    if exception is not None or sidecars is None or app.builder.format != "html":
+        return
+    copy_sidecars(
+        get_sidecar_directory(app.env),
+        Path(app.outdir) / "_static" / SIDECAR_DIRECTORY,
+        set().union(*sidecars.values()),
+    )
+
+
+def _report_cache_stats(app: "Sphinx", exception: Optional[Exception]) -> None:
+    from sphinx.util import logging
+
+    stats = _cache_stats(app.env)
+    if stats:
+        logger = logging.getLogger(EXTENSION_NAME)
+        logger.info(f"myst-nb-json render cache: {stats['hits']} hits, {stats['misses']} misses")
+
+
+def _report_metrics(app: "Sphinx", exception: Optional[Exception]) -> None:
+    from sphinx.util import logging
+
+    metrics = _metrics(app.env)
+    if exception is not None or not metrics:
+        return
+    logger = logging.getLogger(EXTENSION_NAME)
+    top = app.config.myst_nb_json_report_top
+    if top:
+        for metric, title in (("seconds", "slowest"), ("bytes", "largest")):
+            logger.info(f"myst-nb-json {title} outputs:")
+            for output in sorted(metrics, key=lambda output: output[metric], reverse=True)[:top]:
+                logger.info(
+                    f"  {output['docname']}:{output['line']}"
+                    f" {output['seconds'] * 1000:10.1f} ms {output['bytes'] / 1024:10.1f} KiB"
+                    f" {output['nodes']:10} nodes {output['depth']:5} depth"
+                    + (" (cached)" if output["cached"] else "")
+                )
+    if app.config.myst_nb_json_report_file:
+        path = Path(app.outdir) / app.config.myst_nb_json_report_file
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({"outputs": metrics}, indent=2))
+        logger.info(f"myst-nb-json report written to {path}")
+
+
+def _shutdown_process_pools(app: "Sphinx", exception: Optional[Exception]) -> None:
+    # The processes for rendering large outputs in parallel are not needed after the build.
+    shutdown_process_pools()
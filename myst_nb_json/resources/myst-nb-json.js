@@ -1,28 +1,822 @@
-// Script to be embedded inside the component's root HTMLElement
-(function (component) {
-    document.addEventListener('DOMContentLoaded', () => {
-        const CLASS_KEY = "myst-nb-json-key";
-        const CLASS_COLLAPSIBLE = "myst-nb-json-collapsible";
-        const CLASS_COLLAPSED = "myst-nb-json-collapsed";
-
-        let toggleable = Array.from(component.getElementsByTagName("li"));
-        toggleable.forEach((li) => {
-            // Find list item elements that contain a nested, collapsible value.
-            if (li.getElementsByClassName(CLASS_COLLAPSIBLE).length == 0) return;
-            let key = li.getElementsByClassName(CLASS_KEY)[0];
-            let toggleFn = function() {
-                let isCollapsed = li.classList.contains(CLASS_COLLAPSED);
-                if (isCollapsed) {
-                    li.classList.remove(CLASS_COLLAPSED);
-                } else {
-                    li.classList.add(CLASS_COLLAPSED);
+// Script to be either embedded inside each component's root HTMLElement, or included once per page.
+(function (script) {
+    const CLASS_COMPONENT = "myst-nb-json";
+    const CLASS_COMPACT = "myst-nb-json-compact";
+    const CLASS_KEY = "myst-nb-json-key";
+    const CLASS_VALUE = "myst-nb-json-value";
+    const CLASS_COLLAPSIBLE = "myst-nb-json-collapsible";
+    const CLASS_COLLAPSED = "myst-nb-json-collapsed";
+    const CLASS_HIDDEN = "myst-nb-json-hidden";
+    const CLASS_MORE = "myst-nb-json-more";
+    const CLASS_MATCH = "myst-nb-json-match";
+    const CLASS_NUMBERS = "myst-nb-json-numbers";
+    const CLASS_SEARCH = "myst-nb-json-search";
+    const CLASS_SPACER = "myst-nb-json-spacer";
+    const CLASS_SWITCH = "myst-nb-json-switch";
+    const CLASS_TABLE = "myst-nb-json-table";
+    const CLASS_TREE = "myst-nb-json-tree";
+    const CLASS_UNSELECTABLE = "myst-nb-json-unselectable";
+    const CLASS_VIRTUAL = "myst-nb-json-virtual";
+    // Class names of the elements repeated for every value. Compact markup has short class names,
+    // no hidden punctuation for copying valid JSON, and only collapsible keys are focusable.
+    const FULL_MARKUP = {key: CLASS_KEY, value: CLASS_VALUE, collapsed: CLASS_COLLAPSED, punctuation: true};
+    const COMPACT_MARKUP = {key: "k", value: "v", collapsed: "c", punctuation: false};
+    // Number of items to render at once from an embedded payload, unless the component specifies
+    // a maximum number of items.
+    const CHUNK_SIZE = 100;
+    // Non-finite numbers are not valid JSON, they are replaced by marked strings when parsing.
+    const NON_FINITE_MARKER = "\u0000";
+    // Components in client mode are rendered when they come within this distance of the viewport.
+    const RENDER_MARGIN = "200px";
+    // Directory of the data files of large outputs, relative to this script, and the global
+    // function called by them.
+    const SIDECAR_DIRECTORY = "myst-nb-json-data";
+    const SIDECAR_CALLBACK = "mystNbJsonLoad";
+    // Maximum number of matches of a search.
+    const MAX_MATCHES = 1000;
+    // Number of items of a virtual list rendered before and after the visible ones.
+    const VIRTUAL_OVERSCAN = 20;
+
+    // Values of collapsed list items whose children are rendered only when first expanded.
+    const pendingValues = new WeakMap();
+    // Data files being loaded, by name of the data file.
+    const sidecarLoads = new Map();
+    // Lists waiting for their items to be loaded from a data file.
+    const loadingLists = new WeakMap();
+    // Search indexes prepared on first use, and the matches of the last query, by search box.
+    const searchIndexes = new WeakMap();
+    const searchResults = new WeakMap();
+    // Virtual lists by list element, the index of their rendered items, and the items that were
+    // expanded or collapsed by the user, which are kept when they are scrolled out of view.
+    const virtualLists = new WeakMap();
+    const virtualRows = new WeakMap();
+    const changedRows = new WeakSet();
+    // Updates virtual lists when they are shown, resized, or their items change their height.
+    const resizeObserver = "ResizeObserver" in window ? new ResizeObserver((entries) => {
+        entries.forEach((entry) => {
+            let ul = virtualLists.has(entry.target) ? entry.target : entry.target.parentElement;
+            if (ul && virtualLists.has(ul)) scheduleVirtual(ul);
+        });
+    }) : null;
+
+    function parsePayload(text) {
+        let json = text.replace(/"(?:[^"\\]|\\.)*"|-?Infinity|NaN/g, (match) =>
+            match[0] === '"' ? match : `"${NON_FINITE_MARKER}${match}"`
+        );
+        return JSON.parse(json);
+    }
+
+    function element(tagName, className, ...children) {
+        let el = document.createElement(tagName);
+        if (className) el.className = className;
+        el.append(...children);
+        return el;
+    }
+
+    function hidden(text) {
+        return element("span", CLASS_HIDDEN, text);
+    }
+
+    function punctuation(markup, text) {
+        return markup.punctuation ? [hidden(text)] : [];
+    }
+
+    function markupOf(el) {
+        return el.closest(`.${CLASS_COMPONENT}`).classList.contains(CLASS_COMPACT) ? COMPACT_MARKUP : FULL_MARKUP;
+    }
+
+    function isNested(value) {
+        return value !== null && typeof value === "object" && Object.keys(value).length > 0;
+    }
+
+    function scalarText(value) {
+        if (typeof value === "string" && value.startsWith(NON_FINITE_MARKER)) return value.slice(1);
+        return JSON.stringify(value);
+    }
+
+    function jsonText(value) {
+        // Like JSON.stringify, but with the separators of Python's json.dumps and non-finite numbers.
+        if (Array.isArray(value)) return `[${value.map(jsonText).join(", ")}]`;
+        if (value !== null && typeof value === "object") {
+            return `{${Object.entries(value).map(([k, v]) => `${JSON.stringify(k)}: ${jsonText(v)}`).join(", ")}}`;
+        }
+        return scalarText(value);
+    }
+
+    function renderKey(key, collapsible, selectable, markup) {
+        if (!markup.punctuation) {
+            let keyElement = element("span", markup.key + (selectable ? "" : " " + CLASS_UNSELECTABLE), String(key));
+            if (collapsible) keyElement.tabIndex = 0;
+            return keyElement;
+        }
+        let keyElement = element(
+            "span",
+            CLASS_KEY + (collapsible ? " " + CLASS_COLLAPSIBLE : "") + (selectable ? "" : " " + CLASS_UNSELECTABLE),
+            hidden('"'), String(key), hidden('"'), hidden(": "),
+        );
+        keyElement.tabIndex = 0;
+        return keyElement;
+    }
+
+    function renderValue(value, withComma, markup) {
+        let comma = withComma ? punctuation(markup, ", ") : [];
+        if (!isNested(value)) {
+            return [element("span", markup.value, scalarText(value)), ...comma];
+        }
+        let isArray = Array.isArray(value);
+        let ul = element("ul");
+        // Children are rendered when the (initially collapsed) value is first expanded.
+        let items = isArray ? value : Object.entries(value);
+        pendingValues.set(ul, {items: items, isObject: !isArray});
+        return [element(
+            "div", markup.value,
+            ...punctuation(markup, isArray ? "[" : "{"), ul, ...punctuation(markup, isArray ? "]" : "}"), ...comma,
+        )];
+    }
+
+    function renderItem(item, isObject, withComma, markup) {
+        let value = isObject ? item[1] : item;
+        let nested = isNested(value);
+        let li = element("li", nested ? markup.collapsed : "");
+        if (isObject) li.append(renderKey(item[0], nested, true, markup));
+        li.append(...renderValue(value, withComma, markup));
+        return li;
+    }
+
+    function renderItems(ul, items, isObject, before) {
+        // Render a chunk of items, and a placeholder for the remaining ones. All items of a long
+        // array or object are rendered as virtual list instead.
+        let component = ul.closest(`.${CLASS_COMPONENT}`);
+        if (before === null && ul.childElementCount === 0 && items.length >= parseInt(component.dataset.virtualMinItems)) {
+            renderVirtual(ul, items, isObject);
+            return;
+        }
+        let chunkSize = parseInt(component.dataset.maxItems) || CHUNK_SIZE;
+        let markup = markupOf(ul);
+        let chunk = items.slice(0, chunkSize);
+        chunk.forEach((item, index) => {
+            ul.insertBefore(renderItem(item, isObject, index < items.length - 1, markup), before);
+        });
+        if (items.length > chunk.length) {
+            let rest = items.slice(chunk.length);
+            let li = renderMore(rest.length, "li");
+            pendingValues.set(li, {items: rest, isObject: isObject});
+            ul.insertBefore(li, before);
+        }
+    }
+
+    function renderVirtual(ul, items, isObject) {
+        // Render a long array or object in a scrollable box, in which only the items in or near
+        // its visible part are elements. The items before and after them are replaced by spacers
+        // of their height, and items scrolled out of view are removed again.
+        let spacer = () => {
+            let li = element("li", `${CLASS_SPACER} ${CLASS_UNSELECTABLE}`);
+            li.setAttribute("aria-hidden", "true");
+            return li;
+        };
+        let list = {
+            items: items,
+            isObject: isObject,
+            markup: markupOf(ul),
+            expanded: false,
+            // The height of every item, estimated from the first one until it is rendered, and
+            // their offsets from the top, which are computed again when a height changes.
+            heights: null,
+            offsets: null,
+            // The rendered items by index, and the changed items that are not rendered.
+            rows: new Map(),
+            kept: new Map(),
+            top: spacer(),
+            bottom: spacer(),
+            frame: 0,
+        };
+        virtualLists.set(ul, list);
+        ul.classList.add(CLASS_VIRTUAL);
+        ul.append(list.top, list.bottom);
+        ul.addEventListener("scroll", () => scheduleVirtual(ul), {passive: true});
+        if (resizeObserver) resizeObserver.observe(ul);
+        updateVirtual(ul);
+    }
+
+    function scheduleVirtual(ul) {
+        let list = virtualLists.get(ul);
+        if (list.frame === 0) list.frame = requestAnimationFrame(() => updateVirtual(ul));
+    }
+
+    function virtualOffsets(list) {
+        if (list.offsets === null) {
+            list.offsets = new Float64Array(list.items.length + 1);
+            for (let index = 0; index < list.items.length; index++) {
+                list.offsets[index + 1] = list.offsets[index] + list.heights[index];
+            }
+        }
+        return list.offsets;
+    }
+
+    function virtualIndex(offsets, offset) {
+        // Binary search for the item at an offset from the top.
+        let low = 0;
+        let high = offsets.length - 2;
+        while (low < high) {
+            let middle = (low + high + 1) >> 1;
+            if (offsets[middle] <= offset) low = middle; else high = middle - 1;
+        }
+        return low;
+    }
+
+    function updateVirtual(ul) {
+        // Render the items in or near the visible part of a virtual list, and remove the others.
+        let list = virtualLists.get(ul);
+        list.frame = 0;
+        // A list inside a collapsed value has no layout, it is updated when it is shown.
+        if (ul.getClientRects().length === 0) return;
+        let count = list.items.length;
+        if (list.heights === null) {
+            let first = renderVirtualRow(ul, list, 0, list.bottom);
+            list.heights = new Float64Array(count).fill(first.offsetHeight);
+        }
+        list.rows.forEach((li, index) => {
+            if (li.offsetHeight !== list.heights[index]) {
+                list.heights[index] = li.offsetHeight;
+                list.offsets = null;
+            }
+        });
+        let offsets = virtualOffsets(list);
+        let start = Math.max(0, virtualIndex(offsets, ul.scrollTop) - VIRTUAL_OVERSCAN);
+        let end = Math.min(count, virtualIndex(offsets, ul.scrollTop + ul.clientHeight) + 1 + VIRTUAL_OVERSCAN);
+        list.rows.forEach((li, index) => {
+            if (index >= start && index < end) return;
+            li.remove();
+            list.rows.delete(index);
+            if (resizeObserver) resizeObserver.unobserve(li);
+            if (changedRows.has(li)) list.kept.set(index, li);
+        });
+        // The remaining items are in order, new items are inserted before the next one.
+        let before = list.top.nextElementSibling;
+        for (let index = start; index < end; index++) {
+            let li = list.rows.get(index);
+            if (li === undefined) {
+                renderVirtualRow(ul, list, index, before);
+            } else {
+                before = li.nextElementSibling;
+            }
+        }
+        list.top.style.height = `${offsets[start]}px`;
+        list.bottom.style.height = `${offsets[count] - offsets[end]}px`;
+    }
+
+    function renderVirtualRow(ul, list, index, before) {
+        let li = list.kept.get(index);
+        let isNew = li === undefined;
+        if (isNew) {
+            li = renderItem(list.items[index], list.isObject, index < list.items.length - 1, list.markup);
+        } else {
+            list.kept.delete(index);
+        }
+        list.rows.set(index, li);
+        virtualRows.set(li, index);
+        ul.insertBefore(li, before);
+        if (isNew && list.expanded && li.classList.contains(list.markup.collapsed)) toggle(li);
+        if (resizeObserver) resizeObserver.observe(li);
+        return li;
+    }
+
+    function virtualRow(ul, index) {
+        // Scroll a virtual list to an item, and get its element.
+        let list = virtualLists.get(ul);
+        if (index >= list.items.length) return null;
+        updateVirtual(ul);
+        if (list.heights === null) return null;
+        ul.scrollTop = virtualOffsets(list)[index];
+        updateVirtual(ul);
+        return list.rows.get(index) || null;
+    }
+
+    function expandItems(ul) {
+        // Expand the nested items of a list, also the items of a virtual list rendered later.
+        let list = virtualLists.get(ul);
+        if (list) list.expanded = true;
+        ul.querySelectorAll(`:scope > li.${markupOf(ul).collapsed}`).forEach(toggle);
+    }
+
+    function renderMore(count, tagName, colSpan) {
+        let button = element("span", CLASS_UNSELECTABLE, `… ${count} more item${count !== 1 ? "s" : ""}`);
+        button.tabIndex = 0;
+        if (tagName === "tr") {
+            let td = element("td", "", button);
+            td.colSpan = colSpan;
+            return element("tr", CLASS_MORE, td);
+        }
+        return element("li", CLASS_MORE, button);
+    }
+
+    function tableColumns(table) {
+        return Array.from(table.tHead.rows[0].cells, (th) => th.textContent);
+    }
+
+    function renderRows(tbody, records, before) {
+        // Render a chunk of records as table rows, and a placeholder for the remaining ones.
+        let component = tbody.closest(`.${CLASS_COMPONENT}`);
+        let chunkSize = parseInt(component.dataset.maxItems) || CHUNK_SIZE;
+        let columns = tableColumns(tbody.parentElement);
+        let markup = markupOf(tbody);
+        records.slice(0, chunkSize).forEach((record) => {
+            let tr = element("tr");
+            columns.forEach((column) => tr.append(element("td", "", element("span", markup.value, jsonText(record[column])))));
+            tbody.insertBefore(tr, before);
+        });
+        if (records.length > chunkSize) {
+            let rest = records.slice(chunkSize);
+            let tr = renderMore(rest.length, "tr", columns.length);
+            pendingValues.set(tr, {items: rest, isObject: false});
+            tbody.insertBefore(tr, before);
+        }
+    }
+
+    function tableRecords(table) {
+        // Get the records of a table from the values in its cells and elided rows.
+        let columns = tableColumns(table);
+        let records = [];
+        Array.from(table.tBodies[0].rows).forEach((tr) => {
+            if (tr.classList.contains(CLASS_MORE)) {
+                let pending = pendingValues.get(tr);
+                records.push(...(pending ? pending.items : parsePayload(tr.querySelector("script").textContent)));
+            } else {
+                let record = {};
+                columns.forEach((column, index) => record[column] = parsePayload(tr.cells[index].textContent));
+                records.push(record);
+            }
+        });
+        return records;
+    }
+
+    function renderTree(view) {
+        // Render the tree view of a table.
+        let records = tableRecords(view.querySelector(":scope > table"));
+        let withComma = view.lastElementChild.textContent === ", ";
+        let [tree] = renderValue(records, withComma, markupOf(view));
+        tree.classList.add(CLASS_TREE);
+        let button = element("span", `${CLASS_SWITCH} ${CLASS_UNSELECTABLE}`, "table");
+        button.tabIndex = 0;
+        tree.prepend(button);
+        return tree;
+    }
+
+    function switchView(view) {
+        // Switch between the table and the tree view of an array, rendering the tree when first shown.
+        let other;
+        if (view.classList.contains(CLASS_TABLE)) {
+            other = view.nextElementSibling;
+            if (!other) {
+                other = renderTree(view);
+                view.after(other);
+                let ul = other.querySelector(":scope > ul");
+                renderPending(ul);
+                // The objects in an array have no key to expand them, so they are shown expanded.
+                expandItems(ul);
+            }
+        } else {
+            other = view.previousElementSibling;
+        }
+        view.hidden = true;
+        other.hidden = false;
+        other.firstElementChild.focus();
+    }
+
+    function loadData(name) {
+        // Load a value from a data file, resolving to undefined if it fails. The file is loaded as
+        // script rather than fetched, which also works for pages opened from file://.
+        let load = sidecarLoads.get(name);
+        if (load === undefined) {
+            load = {};
+            load.promise = new Promise((resolve) => load.resolve = resolve);
+            sidecarLoads.set(name, load);
+            let loader = document.createElement("script");
+            loader.src = new URL(`${SIDECAR_DIRECTORY}/${name}.js`, (script && script.src) || document.baseURI).href;
+            loader.onerror = () => {
+                sidecarLoads.delete(name);
+                load.resolve(undefined);
+            };
+            document.head.append(loader);
+        }
+        return load.promise;
+    }
+
+    window[SIDECAR_CALLBACK] = (name, text) => {
+        let load = sidecarLoads.get(name);
+        if (load === undefined) return;
+        sidecarLoads.delete(name);
+        load.resolve(parsePayload(text));
+    };
+
+    function loadSidecar(ul) {
+        // Load the value of a large output from its data file, and render its items.
+        let name = ul.dataset.sidecar;
+        delete ul.dataset.sidecar;
+        loadingLists.set(ul, loadData(name).then((value) => {
+            loadingLists.delete(ul);
+            if (value === undefined) {
+                ul.append(element("li", CLASS_MORE, element("span", CLASS_UNSELECTABLE, "Failed to load data")));
+                return;
+            }
+            let isArray = Array.isArray(value);
+            renderItems(ul, isArray ? value : Object.entries(value), !isArray, null);
+            if (ul.closest(`.${CLASS_COMPONENT}`).dataset.expanded !== undefined) expandItems(ul);
+        }));
+    }
+
+    function renderPending(ul) {
+        if (ul.dataset.sidecar !== undefined) {
+            loadSidecar(ul);
+            return;
+        }
+        let pending = pendingValues.get(ul);
+        if (pending === undefined) {
+            // The items of a virtual list rendered at build time are embedded in a placeholder.
+            let placeholder = ul.classList.contains(CLASS_VIRTUAL) && !virtualLists.has(ul)
+                && ul.querySelector(`:scope > .${CLASS_MORE}`);
+            let elided = placeholder && elidedItems(placeholder);
+            if (!elided) return;
+            placeholder.remove();
+            renderVirtual(ul, elided.items, elided.isObject);
+            if (ul.dataset.expanded !== undefined) expandItems(ul);
+            return;
+        }
+        pendingValues.delete(ul);
+        renderItems(ul, pending.items, pending.isObject, null);
+    }
+
+    function elidedItems(placeholder) {
+        // Get the items of a placeholder, either from the embedded payload or from items already
+        // parsed by a previous placeholder.
+        let pending = pendingValues.get(placeholder);
+        if (pending !== undefined) return pending;
+        let payload = placeholder.querySelector("script");
+        // Items skipped when rendering a streamed JSON file are not embedded.
+        if (!payload) return null;
+        return {items: parsePayload(payload.textContent), isObject: placeholder.dataset.kind === "object"};
+    }
+
+    function expandMore(placeholder) {
+        // Replace the placeholder (list item or table row) by the elided items.
+        if (placeholder.dataset.kind === "numbers") {
+            // Show all values of a summarized array of numbers instead of its first and last ones.
+            let values = parsePayload(placeholder.querySelector("script").textContent);
+            placeholder.previousElementSibling.remove();
+            placeholder.nextElementSibling.remove();
+            placeholder.replaceWith(element("span", markupOf(placeholder).value, values.map(scalarText).join(", ")));
+            return;
+        }
+        if (placeholder.parentElement.classList.contains(CLASS_VIRTUAL)) {
+            // The placeholder of a virtual list that is not rendered yet.
+            renderPending(placeholder.parentElement);
+            return;
+        }
+        let pending = elidedItems(placeholder);
+        if (pending === null) return;
+        if (placeholder.tagName === "TR") {
+            renderRows(placeholder.parentElement, pending.items, placeholder);
+        } else {
+            renderItems(placeholder.parentElement, pending.items, pending.isObject, placeholder);
+        }
+        placeholder.remove();
+    }
+
+    function toggle(li) {
+        let markup = markupOf(li);
+        let isCollapsed = li.classList.contains(markup.collapsed);
+        if (isCollapsed) {
+            let ul = li.querySelector(`:scope > .${markup.value} > ul`);
+            if (ul) renderPending(ul);
+            li.classList.remove(markup.collapsed);
+        } else {
+            li.classList.add(markup.collapsed);
+        }
+    }
+
+    function renderComponent(component) {
+        // Render the root and the initially expanded levels of a component in client mode.
+        let payload = component.querySelector(":scope > script[type='application/json']");
+        if (!payload) return;
+        let markup = markupOf(component);
+        let value = parsePayload(payload.textContent);
+        let nested = isNested(value);
+        let li = element("li", "", renderKey(component.dataset.root, nested, false, markup), ...renderValue(value, false, markup));
+        payload.replaceWith(element("div", markup.value, element("ul", "", li)));
+        if (!nested) return;
+        let ul = li.querySelector(`:scope > .${markup.value} > ul`);
+        renderPending(ul);
+        if (component.dataset.expanded !== undefined) expandItems(ul);
+    }
+
+    function prepareIndex(index) {
+        // Reconstruct the parent and the position of every value from the depths, and join the
+        // lowercase keys and values into one string, which is searched with the native indexOf
+        // instead of rendering or scanning any elements.
+        let count = index.depths.length;
+        let parents = new Int32Array(count);
+        let positions = new Int32Array(count);
+        let offsets = new Int32Array(count + 1);
+        let texts = new Array(count);
+        // The values on the path to the current one, with their number of children so far.
+        let ancestors = [];
+        let offset = 0;
+        for (let node = 0; node < count; node++) {
+            let depth = index.depths[node];
+            ancestors.length = depth;
+            let parent = ancestors[depth - 1];
+            parents[node] = parent ? parent.node : -1;
+            positions[node] = parent ? parent.children++ : 0;
+            ancestors.push({node: node, children: 0});
+            let key = index.keys[node];
+            let value = index.values[node];
+            texts[node] = `${key === null ? "" : key}\u0001${value === null ? "" : value}`.toLowerCase();
+            offsets[node] = offset;
+            offset += texts[node].length + 1;
+        }
+        offsets[count] = offset;
+        return {parents: parents, positions: positions, offsets: offsets, text: texts.join("\n")};
+    }
+
+    async function loadIndex(box) {
+        let index = searchIndexes.get(box);
+        if (index) return index;
+        let payload = box.querySelector("script");
+        let data = payload ? parsePayload(payload.textContent) : await loadData(box.dataset.sidecar);
+        if (data === undefined) return null;
+        index = searchIndexes.get(box) || prepareIndex(data);
+        searchIndexes.set(box, index);
+        return index;
+    }
+
+    function findNodes(index, query) {
+        // Find the values whose key or value contains the query, in the order they are rendered.
+        let nodes = [];
+        let position = index.text.indexOf(query);
+        while (position !== -1 && nodes.length < MAX_MATCHES) {
+            // Binary search for the value containing the position.
+            let low = 0;
+            let high = index.offsets.length - 2;
+            while (low < high) {
+                let middle = (low + high + 1) >> 1;
+                if (index.offsets[middle] <= position) low = middle; else high = middle - 1;
+            }
+            nodes.push(low);
+            position = index.text.indexOf(query, index.offsets[low + 1]);
+        }
+        return nodes;
+    }
+
+    function nodePath(index, node) {
+        let path = [];
+        for (; index.parents[node] !== -1; node = index.parents[node]) path.push(index.positions[node]);
+        return path.reverse();
+    }
+
+    async function childItem(li, position, markup) {
+        // Expand a list item, and get its child at a position, rendering elided items as needed.
+        if (li.classList.contains(markup.collapsed)) toggle(li);
+        let view = li.querySelector(`:scope > .${markup.value}`);
+        if (view && view.classList.contains(CLASS_TABLE)) {
+            if (!view.hidden) switchView(view);
+            view = view.nextElementSibling;
+        }
+        let ul = view && view.querySelector(":scope > ul");
+        if (!ul) return null;
+        renderPending(ul);
+        if (loadingLists.has(ul)) await loadingLists.get(ul);
+        if (virtualLists.has(ul)) return virtualRow(ul, position);
+        for (;;) {
+            let child = ul.children[position];
+            if (child && !child.classList.contains(CLASS_MORE)) return child;
+            let placeholder = child || ul.lastElementChild;
+            if (!placeholder || !placeholder.classList.contains(CLASS_MORE) || !elidedItems(placeholder)) return null;
+            expandMore(placeholder);
+        }
+    }
+
+    async function revealPath(component, path) {
+        // Expand the values along a path of positions, and get the list item at its end.
+        renderComponent(component);
+        let markup = markupOf(component);
+        let li = component.querySelector(`:scope > .${markup.value} > ul > li`);
+        for (let position of path) {
+            if (!li) return null;
+            li = await childItem(li, position, markup);
+        }
+        return li;
+    }
+
+    async function search(box, step) {
+        // Count the matches of the query, and reveal the next (step 1) or previous (step -1) one.
+        let index = await loadIndex(box);
+        if (!index) return;
+        let input = box.querySelector("input");
+        let query = input.value.toLowerCase();
+        let results = searchResults.get(box);
+        if (!results || results.query !== query) {
+            if (results && results.match) results.match.classList.remove(CLASS_MATCH);
+            results = {query: query, nodes: query ? findNodes(index, query) : [], current: -1, match: null};
+            searchResults.set(box, results);
+        }
+        let count = results.nodes.length;
+        if (step !== 0 && count > 0) {
+            results.current = results.current === -1 && step < 0 ? count - 1 : (results.current + step + count) % count;
+            let li = await revealPath(box.parentElement, nodePath(index, results.nodes[results.current]));
+            if (results.match) results.match.classList.remove(CLASS_MATCH);
+            results.match = li;
+            if (li) {
+                li.classList.add(CLASS_MATCH);
+                li.scrollIntoView({block: "nearest"});
+            }
+            // Switching a table to the tree view moves the focus.
+            input.focus({preventScroll: true});
+        }
+        let more = count >= MAX_MATCHES ? "+" : "";
+        let status = results.current === -1 ? `${count}${more} match${count === 1 ? "" : "es"}` : `${results.current + 1} / ${count}${more}`;
+        box.querySelector("span").textContent = query ? status : "";
+    }
+
+    function searchBoxOf(target) {
+        let box = target instanceof HTMLInputElement && target.parentElement;
+        return box && box.classList.contains(CLASS_SEARCH) ? box : null;
+    }
+
+    function activate(target) {
+        // Toggle the list item's collapsed state when activating its key, render the items of a
+        // placeholder, or switch the view of a table. Returns whether the target was interactive.
+        if (!(target instanceof Element)) return false;
+        let interactive = target.closest(
+            `.${CLASS_KEY}.${CLASS_COLLAPSIBLE}, .${CLASS_COMPACT} .${COMPACT_MARKUP.key}[tabindex], `
+            + `.${CLASS_MORE} > span, .${CLASS_MORE} > td > span, .${CLASS_SWITCH}`
+        );
+        if (!interactive || !interactive.closest(`.${CLASS_COMPONENT}`)) return false;
+        // Keep the items of virtual lists containing the target when they are scrolled out of view,
+        // so that they do not lose their state.
+        for (let row = interactive.closest("li"); row; row = row.parentElement.closest("li")) {
+            if (virtualRows.has(row)) changedRows.add(row);
+        }
+        let placeholder = interactive.closest(`.${CLASS_MORE}`);
+        if (interactive.classList.contains(CLASS_SWITCH)) {
+            switchView(interactive.parentElement);
+        } else if (placeholder) {
+            expandMore(placeholder);
+        } else {
+            toggle(interactive.parentElement);
+        }
+        return true;
+    }
+
+    function itemsText(items, isObject) {
+        return items.map((item) => isObject ? `${JSON.stringify(item[0])}: ${jsonText(item[1])}` : jsonText(item));
+    }
+
+    function valueText(view) {
+        // Serialize a value in compact markup to JSON, including children that are not rendered yet.
+        if (view.classList.contains(CLASS_TABLE)) return jsonText(tableRecords(view.querySelector(":scope > table")));
+        if (view.classList.contains(CLASS_NUMBERS)) {
+            let payload = view.querySelector("script");
+            if (payload) return jsonText(parsePayload(payload.textContent));
+            return `[${view.querySelector(`:scope > .${COMPACT_MARKUP.value}`).textContent}]`;
+        }
+        let ul = view.querySelector(":scope > ul");
+        if (!ul) return view.textContent;
+        let pending = pendingValues.get(ul) || virtualLists.get(ul);
+        // The value of a large output is unknown until its data file is loaded.
+        if (!pending && ul.childElementCount === 0) return null;
+        let isObject = pending ? pending.isObject : false;
+        let texts = pending ? itemsText(pending.items, pending.isObject) : [];
+        if (!pending) {
+            Array.from(ul.children).forEach((li) => {
+                if (!li.classList.contains(CLASS_MORE)) {
+                    isObject = li.querySelector(`:scope > .${COMPACT_MARKUP.key}`) !== null;
+                } else if (elidedItems(li)) {
+                    isObject = elidedItems(li).isObject;
+                }
+                let text = itemText(li);
+                if (text !== null) texts.push(text);
+            });
+        }
+        return isObject ? `{${texts.join(", ")}}` : `[${texts.join(", ")}]`;
+    }
+
+    function itemText(li) {
+        // Serialize a list item in compact markup to JSON, with its key unless it is the root.
+        if (li.classList.contains(CLASS_MORE)) {
+            let elided = elidedItems(li);
+            return elided && itemsText(elided.items, elided.isObject).join(", ");
+        }
+        let key = li.querySelector(`:scope > .${COMPACT_MARKUP.key}`);
+        let text = valueText(li.querySelector(`:scope > .${COMPACT_MARKUP.value}`));
+        if (text === null) return null;
+        if (!key || key.classList.contains(CLASS_UNSELECTABLE)) return text;
+        return `${JSON.stringify(key.textContent)}: ${text}`;
+    }
+
+    function copySelection(event) {
+        // Compact markup has no hidden punctuation, so a selection of several values is copied as
+        // the JSON of the list items containing it.
+        let selection = document.getSelection();
+        if (!selection || selection.isCollapsed || selection.rangeCount === 0) return;
+        let range = selection.getRangeAt(0);
+        let ancestor = range.commonAncestorContainer;
+        if (!(ancestor instanceof Element)) ancestor = ancestor.parentElement;
+        let component = ancestor && ancestor.closest(`.${CLASS_COMPACT}`);
+        if (!component) return;
+        // A selection within a single key, value or table cell is copied as it is.
+        if (ancestor.closest(`.${COMPACT_MARKUP.key}, span.${COMPACT_MARKUP.value}, td, th`)) return;
+        let text;
+        if (ancestor.tagName === "UL") {
+            let items = Array.from(ancestor.children).filter(
+                (li) => !li.classList.contains(CLASS_SPACER) && range.intersectsNode(li)
+            );
+            text = items.map(itemText).filter((part) => part !== null).join(", ");
+        } else {
+            let li = ancestor.closest("li");
+            if (!li || !component.contains(li)) li = ancestor.querySelector("li");
+            if (!li) return;
+            text = itemText(li);
+        }
+        if (text === null) return;
+        event.clipboardData.setData("text/plain", text);
+        event.preventDefault();
+    }
+
+    function listen(root) {
+        // A single delegated handler for all components inside the root, including elements that
+        // are rendered later, so there is no work per node when loading the page.
+        root.addEventListener("click", (event) => activate(event.target));
+        root.addEventListener("copy", copySelection);
+        root.addEventListener("input", (event) => {
+            let box = searchBoxOf(event.target);
+            if (box) search(box, 0);
+        });
+        root.addEventListener("keydown", (event) => {
+            let box = searchBoxOf(event.target);
+            if (box) {
+                if (event.key === "Enter") {
+                    event.preventDefault();
+                    search(box, event.shiftKey ? -1 : 1);
                 }
+            } else if (event.code === "ArrowLeft" || event.code === "ArrowRight" || event.code === "Space") {
+                if (activate(event.target)) event.preventDefault();
             }
-            // Make the key element interactive to toggle the list item's collapsed state.
-            key.addEventListener("click", toggleFn);
-            key.addEventListener("keydown", (event) => {
-                if (event.code === "ArrowLeft" || event.code === "ArrowRight" || event.code === "Space") toggleFn()
+        });
+    }
+
+    function renderClientComponents(root) {
+        // Defer rendering components in client mode until they are near the viewport, so that
+        // the initial cost only depends on the visible outputs.
+        let components = Array.from(
+            root.querySelectorAll(`.${CLASS_COMPONENT} > script[type='application/json']`),
+            (payload) => payload.parentElement,
+        );
+        if (!("IntersectionObserver" in window)) {
+            components.forEach(renderComponent);
+            return;
+        }
+        let observer = new IntersectionObserver((entries) => {
+            entries.forEach((entry) => {
+                if (!entry.isIntersecting) return;
+                observer.unobserve(entry.target);
+                renderComponent(entry.target);
             });
+        }, {rootMargin: RENDER_MARGIN});
+        components.forEach((component) => observer.observe(component));
+    }
+
+    function renderVirtualLists(root) {
+        // Render the virtual lists rendered at build time when they are first shown. Lists inside
+        // collapsed values are rendered when they are expanded.
+        let lists = Array.from(root.querySelectorAll(`ul.${CLASS_VIRTUAL}`));
+        if (!("IntersectionObserver" in window)) {
+            lists.forEach(renderPending);
+            return;
+        }
+        let observer = new IntersectionObserver((entries) => {
+            entries.forEach((entry) => {
+                if (!entry.isIntersecting) return;
+                observer.unobserve(entry.target);
+                renderPending(entry.target);
+            });
+        }, {rootMargin: RENDER_MARGIN});
+        lists.forEach((ul) => observer.observe(ul));
+    }
+
+    let parent = script && script.parentElement;
+    if (parent && parent.classList.contains(CLASS_COMPONENT)) {
+        // Embedded: Only handle the component containing this script.
+        listen(parent);
+        document.addEventListener("DOMContentLoaded", () => {
+            renderClientComponents(parent);
+            renderVirtualLists(parent);
+        });
+    } else {
+        // Included once per page: Handle all components.
+        listen(document);
+        document.addEventListener("DOMContentLoaded", () => {
+            renderClientComponents(document);
+            renderVirtualLists(document);
         });
-    });
-})(document.currentScript.parentElement);
+    }
+})(document.currentScript);
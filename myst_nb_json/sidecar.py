@@ -0,0 +1,69 @@
+"""
+Data files for large outputs, which are loaded by the browser when the output is first expanded
+"""
+
+__all__ = ["SIDECAR_CALLBACK", "SIDECAR_DIRECTORY", "copy_sidecars", "write_sidecar"]
+
+import hashlib
+import json
+import os
+import shutil
+from collections.abc import Iterable
+from pathlib import Path
+
+from myst_nb_json.cache import write_atomically
+
+# Directory of the data files, next to the JavaScript file in the static files of the build
+SIDECAR_DIRECTORY = "myst-nb-json-data"
+SIDECAR_FILE_SUFFIX = ".js"
+# Global function of the JavaScript, which is called by the data files
+SIDECAR_CALLBACK = "mystNbJsonLoad"
+
+
+def write_sidecar(directory: os.PathLike, json_text: str) -> str:
+    """
+    Write a data file for a JSON object, unless a file with the same content exists
+
+    The file is a script calling a global function with the JSON text, so that the browser can
+    load it with a script element, which also works for pages opened from the file system.
+
+    Args:
+        directory: The directory of the data files
+        json_text: The compact JSON of the object
+
+    Returns:
+        The name of the data file without suffix, which is a hash of the JSON
+    """
+    name = hashlib.sha256(json_text.encode()).hexdigest()
+    path = Path(directory) / (name + SIDECAR_FILE_SUFFIX)
+    if not path.exists():
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # The JSON is embedded as string, since parsing it as JavaScript object would not
+        # preserve the order of integer-like keys.
+        content = f"{SIDECAR_CALLBACK}({json.dumps(name)}, {json.dumps(json_text)});\n"
+        write_atomically(path, content.encode("utf-8"))
+    return name
+
+
+def copy_sidecars(source: os.PathLike, target: os.PathLike, names: Iterable[str]) -> None:
+    """
+    Copy the data files that are in use to the output directory, and remove the others
+
+    Args:
+        source: The directory where data files are written while reading documents
+        target: The directory of the data files in the output
+        names: The names of the data files that are in use
+    """
+    names = set(names)
+    source = Path(source)
+    target = Path(target)
+    for directory in (source, target):
+        for path in directory.glob(f"*{SIDECAR_FILE_SUFFIX}"):
+            if path.stem not in names:
+                path.unlink(missing_ok=True)
+    if names:
+        target.mkdir(parents=True, exist_ok=True)
+    for name in names:
+        target_path = target / (name + SIDECAR_FILE_SUFFIX)
+        if not target_path.exists():
+            shutil.copyfile(source / target_path.name, target_path)
@@ -0,0 +1,174 @@
+"""
+Incremental JSON tokenizer for rendering large JSON files without loading them into Python objects
+"""
+
+__all__ = [
+    "END_ARRAY",
+    "END_MAP",
+    "MAP_KEY",
+    "START_ARRAY",
+    "START_MAP",
+    "VALUE",
+    "iter_events",
+    "open_json",
+]
+
+import json
+import mmap
+import os
+import re
+from collections.abc import Generator, Iterator
+from contextlib import contextmanager
+from typing import Any, Union, cast
+
+# Kinds of events
+START_MAP = "start_map"
+END_MAP = "end_map"
+START_ARRAY = "start_array"
+END_ARRAY = "end_array"
+MAP_KEY = "map_key"
+VALUE = "value"
+
+# A token, with the separator before it. Separators are matched together with the following token,
+# which halves the number of matches.
+_TOKEN = re.compile(
+    rb"""[ \t\n\r]*(?P<separator>[,:]?)[ \t\n\r]*(?:
+        (?P<open>[{\[])
+        | (?P<close>[}\]])
+        | (?P<string>"[^"\\\x00-\x1f]*(?:\\.[^"\\\x00-\x1f]*)*")
+        | (?P<number>-?(?:0|[1-9][0-9]*)(?P<fraction>(?:\.[0-9]+)?(?:[eE][-+]?[0-9]+)?))
+        | (?P<literal>true|false|null|NaN|-?Infinity)
+    )""",
+    re.VERBOSE,
+)
+_WHITESPACE = re.compile(rb"[ \t\n\r]*")
+_LITERALS: dict[bytes, Any] = {
+    b"true": True,
+    b"false": False,
+    b"null": None,
+    b"NaN": float("nan"),
+    b"Infinity": float("inf"),
+    b"-Infinity": float("-inf"),
+}
+
+# Parser states, by what is expected next
+_EXPECT_VALUE = 0
+_EXPECT_VALUE_OR_END = 1
+_EXPECT_KEY = 2
+_EXPECT_KEY_OR_END = 3
+_EXPECT_COLON = 4
+_EXPECT_COMMA_OR_END = 5
+_EXPECT_NOTHING = 6
+
+
+@contextmanager
+def open_json(path: Union[str, os.PathLike]) -> Generator[Union[mmap.mmap, bytes], None, None]:
+    """
+    Open a JSON file as memory-mapped buffer, which is paged in by the OS as it is read
+
+    Args:
+        path: The path of the file
+
+    Yields:
+        The read-only buffer
+    """
+    with open(path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            # Empty files cannot be memory-mapped.
+            yield b""
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield buffer
+
+
+def iter_events(buffer: Union[mmap.mmap, bytes]) -> Iterator[tuple[str, Any]]:
+    """
+    Parse JSON incrementally, like a SAX parser
+
+    Only the current token is decoded, so memory does not grow with the size of the JSON. Besides
+    standard JSON, NaN and (-)Infinity are accepted, like by json.loads.
+
+    Args:
+        buffer: UTF-8 encoded JSON, for example from :func:`open_json`
+
+    Yields:
+        Events as tuples of the kind, and the key for MAP_KEY or the scalar value for VALUE
+
+    Raises:
+        ValueError: If the JSON is invalid
+    """
+    # The containers that are currently open, as opening character
+    stack: list[bytes] = []
+    state = _EXPECT_VALUE
+    position = 0
+    # The undocumented scanner matches consecutive tokens without passing the position, which is
+    # faster than calling match with the position for every token. It is missing from the stubs.
+    next_match = cast(Any, _TOKEN).scanner(buffer).match
+    while state != _EXPECT_NOTHING:
+        match = next_match()
+        if match is None:
+            raise ValueError(f"Invalid JSON at byte {position}")
+        separator = match["separator"]
+        group = match.lastgroup
+        if state == _EXPECT_COMMA_OR_END:
+            if separator == b",":
+                state = _EXPECT_KEY if stack[-1] == b"{" else _EXPECT_VALUE
+            elif separator or group != "close" or (match["close"] == b"}") != (stack[-1] == b"{"):
+                raise ValueError(f"Invalid JSON at byte {position}")
+            else:
+                yield (END_MAP if stack.pop() == b"{" else END_ARRAY), None
+                state = _EXPECT_COMMA_OR_END if stack else _EXPECT_NOTHING
+                position = match.end()
+                continue
+        elif state == _EXPECT_COLON:
+            if separator != b":":
+                raise ValueError(f"Invalid JSON at byte {position}")
+            state = _EXPECT_VALUE
+        elif separator:
+            raise ValueError(f"Invalid JSON at byte {position}")
+        if group == "close":
+            # Only empty containers end here, the others end after a value.
+            if state == _EXPECT_VALUE_OR_END and match["close"] == b"]":
+                yield END_ARRAY, None
+            elif state == _EXPECT_KEY_OR_END and match["close"] == b"}":
+                yield END_MAP, None
+            else:
+                raise ValueError(f"Invalid JSON at byte {position}")
+            stack.pop()
+        elif state == _EXPECT_KEY or state == _EXPECT_KEY_OR_END:
+            if group != "string":
+                raise ValueError(f"Invalid JSON at byte {position}")
+            yield MAP_KEY, _decode_string(match["string"])
+            state = _EXPECT_COLON
+            position = match.end()
+            continue
+        elif group == "open":
+            punctuation = match["open"]
+            stack.append(punctuation)
+            if punctuation == b"{":
+                state = _EXPECT_KEY_OR_END
+                yield START_MAP, None
+            else:
+                state = _EXPECT_VALUE_OR_END
+                yield START_ARRAY, None
+            position = match.end()
+            continue
+        elif group == "string":
+            yield VALUE, _decode_string(match["string"])
+        elif group == "number":
+            number = match["number"]
+            yield VALUE, float(number) if match["fraction"] else int(number)
+        else:
+            yield VALUE, _LITERALS[match["literal"]]
+        # A value has been completed.
+        state = _EXPECT_COMMA_OR_END if stack else _EXPECT_NOTHING
+        position = match.end()
+    if _WHITESPACE.match(buffer, position).end() != len(buffer):  # type: ignore[union-attr]
+        raise ValueError(f"Extra data at byte {position}")
+
+
+def _decode_string(token: bytes) -> str:
+    # Strings without escape sequences are decoded directly, which is much faster.
+    if b"\\" in token:
+        return json.loads(token)
+    return token[1:-1].decode("utf-8")
@@ -0,0 +1,36 @@
+import pytest
+
+from benchmarks.generators import GENERATORS
+from benchmarks.run import compare, main, run_benchmarks
+
+
+@pytest.mark.parametrize("name", GENERATORS)
+def test_generators(name: str):
+    # It should generate the same document every time
+    assert GENERATORS[name](100) == GENERATORS[name](100)
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(size=100, repeat=1)
+    assert set(results) == {
+        f"{case}/{generator}"
+        for case in ("html", "html_memo", "html_compact", "handle_mime", "sphinx_build")
+        for generator in GENERATORS
+    }
+    assert all(result["output_bytes"] > 0 for result in results.values())
+
+
+def test_compare():
+    baseline = {"html/wide": {"seconds": 1.0, "peak_memory": 100}}
+    assert compare({"html/wide": {"seconds": 1.1, "peak_memory": 100}}, baseline) == []
+    assert compare({"html/wide": {"seconds": 1.5, "peak_memory": 100}}, baseline) == [
+        "html/wide: seconds increased by 50%"
+    ]
+
+
+def test_main_compare(tmp_path):
+    baseline_path = tmp_path / "baseline.json"
+    args = ["--size", "100", "--repeat", "1", "--filter", "html/"]
+    assert main([*args, "--save", str(baseline_path)]) == 0
+    # It should pass when not slower than the baseline within the tolerance
+    assert main([*args, "--compare", str(baseline_path), "--tolerance", "1000"]) == 0
@@ -0,0 +1,41 @@
+import os
+from pathlib import Path
+
+from myst_nb_json.cache import RenderCache
+
+
+def test_key():
+    # It should depend on the content, including the order of keys, and on the options
+    key = RenderCache.key({"a": 1, "b": 2}, root="root")
+    assert key == RenderCache.key({"a": 1, "b": 2}, root="root")
+    assert key != RenderCache.key({"b": 2, "a": 1}, root="root")
+    assert key != RenderCache.key({"a": 1, "b": 2}, root="other")
+
+
+def test_get_put(tmp_path: Path):
+    cache = RenderCache(tmp_path, max_size=1000)
+    assert cache.get("abc") is None
+    cache.put("abc", "<div>ä</div>")
+    assert cache.get("abc") == "<div>ä</div>"
+    # It should persist across instances
+    assert RenderCache(tmp_path, max_size=1000).get("abc") == "<div>ä</div>"
+
+
+def test_evict_least_recently_used(tmp_path: Path):
+    cache = RenderCache(tmp_path, max_size=350)
+    for index, key in enumerate(["aa", "bb", "cc"]):
+        cache.put(key, "x" * 100)
+        os.utime(cache._path(key), (index, index))
+    # Using an item should prevent it from being evicted
+    assert cache.get("aa") is not None
+    cache.put("dd", "x" * 100)
+    assert cache.get("aa") is not None
+    assert cache.get("bb") is None
+    assert cache.get("cc") is not None
+    assert cache.get("dd") is not None
+
+
+def test_skip_too_large(tmp_path: Path):
+    cache = RenderCache(tmp_path, max_size=10)
+    cache.put("abc", "x" * 100)
+    assert cache.get("abc") is None
@@ -0,0 +1,70 @@
+import io
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from myst_nb_json.__main__ import main
+
+
+def test_import_dependencies():
+    code = (
+        "import sys, myst_nb_json.core, myst_nb_json.__main__; "
+        "print(sorted({'docutils', 'myst_nb', 'sphinx'} & set(sys.modules)))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    # It should not import MyST-NB, docutils or Sphinx, so that it starts quickly. The import time
+    # is measured by benchmarks/bench_import.py.
+    assert result.stdout.strip() == "[]"
+
+
+def test_main_files(tmp_path: Path):
+    (tmp_path / "a.json").write_text(json.dumps({"key": [1, 2, 3]}))
+    (tmp_path / "b.json").write_text(json.dumps(["value"]))
+    status = main([str(tmp_path / "a.json"), str(tmp_path / "b.json"), "-o", str(tmp_path / "out")])
+    assert status == 0
+    # It should write a standalone page per file, embedding the CSS and JavaScript
+    page = (tmp_path / "out" / "a.html").read_text(encoding="utf-8")
+    assert page.startswith("<!DOCTYPE html>")
+    assert "<title>a.json</title>" in page
+    assert ">key<" in page
+    assert "<style>" in page and "<script defer>" in page
+    assert (tmp_path / "out" / "b.html").exists()
+
+
+def test_main_stdin(monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture):
+    monkeypatch.setattr(sys, "stdin", io.StringIO('{"key": "value"}'))
+    status = main(["--root", "data", "--mode", "client", "--max-items", "none"])
+    assert status == 0
+    # It should write the page to stdout, with the options applied
+    page = capsys.readouterr().out
+    assert "<title>data</title>" in page
+    assert 'data-root="data"' in page
+
+
+def test_main_invalid_file(tmp_path: Path, capsys: pytest.CaptureFixture):
+    (tmp_path / "invalid.json").write_text("{")
+    (tmp_path / "valid.json").write_text("1")
+    status = main([str(tmp_path / "invalid.json"), str(tmp_path / "valid.json")])
+    # It should report the invalid file, and still render the others
+    assert status == 1
+    assert "cannot render" in capsys.readouterr().err
+    assert (tmp_path / "valid.html").exists()
+    assert not (tmp_path / "invalid.html").exists()
+
+
+def test_main_output_collision(tmp_path: Path, capsys: pytest.CaptureFixture):
+    for name in ["a", "b"]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / "data.json").write_text(json.dumps({"key": name}))
+    status = main(
+        [str(tmp_path / "a" / "data.json"), str(tmp_path / "b" / "data.json"), "-o", str(tmp_path)]
+    )
+    # It should report the second file instead of overwriting the page of the first
+    assert status == 1
+    assert "is already rendered from" in capsys.readouterr().err
+    assert '>"a"<' in (tmp_path / "data.html").read_text(encoding="utf-8")
@@ -0,0 +1,30 @@
+from myst_nb_json.memo import RenderMemo
+
+
+def test_intern():
+    memo = RenderMemo(max_size=100)
+    node_id = memo.intern((False, (1, 2)))
+    # It should return the same id for equal structures, and count them
+    assert memo.intern((False, (1, 2))) == node_id
+    assert memo.intern((True, (1, 2))) != node_id
+    assert memo.count(node_id) == 2
+
+
+def test_evict_oldest():
+    memo = RenderMemo(max_size=250)
+    for key in ["a", "b", "c"]:
+        memo.put(key, "x" * 100)
+    assert memo.get("a") is None
+    assert memo.get("b") is not None
+    assert memo.get("c") is not None
+
+
+def test_trim():
+    memo = RenderMemo(max_size=100, max_entries=2)
+    for structure in range(3):
+        memo.intern(structure)
+    memo.put(0, "x")
+    memo.trim()
+    # It should clear the table when it has too many structures
+    assert memo.get(0) is None
+    assert memo.intern(2) == 0
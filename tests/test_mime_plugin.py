@@ -1,8 +1,30 @@
+import array
+import collections
+import enum
+import io
+import json
 import re
+import sys
 
 import pytest
 
-from myst_nb_json import JsonMimeRenderPlugin
+from myst_nb_json import (
+    BudgetExceededError,
+    JsonMimeRenderPlugin,
+    count_nodes,
+    enforce_budget,
+    format_scalar,
+    get_plugin,
+    get_process_pool,
+    is_nested,
+    json_stats,
+    search_index,
+    shutdown_process_pools,
+    truncated_json,
+    value_kind,
+)
+from myst_nb_json.memo import RenderMemo
+from myst_nb_json.stream import START_ARRAY, VALUE, iter_events
 
 
 @pytest.fixture
@@ -99,3 +121,414 @@ def test_dict_value(plugin: JsonMimeRenderPlugin, value, expected_xml: str, expe
     assert _strip_xml_whitespace(_strip_xml_attributes(actual)) == expected_xml
     # It should preserve JSON syntax as user-electable text (even if braces and quotes are not displayed)
     assert _html_unescape(_strip_xml_tags(actual)) == expected_text
+
+
+@pytest.mark.parametrize("inline_assets", [True, False])
+def test_html_inline_assets(inline_assets: bool):
+    actual = JsonMimeRenderPlugin(inline_assets=inline_assets).html({"k": "v"})
+    # It should embed CSS and JavaScript only if requested
+    assert ("<style>" in actual) == inline_assets
+    assert ("<script" in actual) == inline_assets
+
+
+def test_get_plugin_is_shared():
+    # It should reuse one instance per configuration
+    assert get_plugin() is get_plugin()
+    assert get_plugin(inline_assets=False) is get_plugin(inline_assets=False)
+    assert get_plugin(inline_assets=False) is not get_plugin(inline_assets=True)
+
+
+def test_deeply_nested_value(plugin: JsonMimeRenderPlugin):
+    depth = 10 * sys.getrecursionlimit()
+    value: list = []
+    for _ in range(depth):
+        value = [value]
+    # It should not exceed the recursion limit
+    actual = "".join(plugin.value(value))
+    assert actual.count("<ul>") == depth
+    assert _html_unescape(_strip_xml_tags(actual)) == "[" * depth + "[]" + "]" * depth
+
+
+def _payloads(html: str) -> list:
+    return [
+        json.loads(payload)
+        for payload in re.findall(r'<script type="application/json">(.*?)</script>', html)
+    ]
+
+
+def test_max_items(plugin: JsonMimeRenderPlugin):
+    actual = plugin.html({"a": list(range(5)), "b": 1, "c": 2}, max_items=2)
+    # It should elide items beyond the limit, per array or object
+    assert "… 3 more items" in actual
+    assert "… 1 more item<" in actual
+    assert _payloads(actual) == [[2, 3, 4], [["c", 2]]]
+
+
+def test_max_depth(plugin: JsonMimeRenderPlugin):
+    actual = plugin.html({"a": {"b": {"c": 1}}, "d": [1]}, max_depth=1)
+    # It should elide all items of values deeper than the limit
+    assert "… 1 item<" in actual
+    assert _payloads(actual) == [[["b", {"c": 1}]], [1]]
+
+
+def test_max_nodes(plugin: JsonMimeRenderPlugin):
+    actual = plugin.html([[1, 2], [3, 4]], max_nodes=3)
+    # It should elide all items after the limit is reached
+    assert _payloads(actual) == [[2], [[3, 4]]]
+
+
+def test_payload_is_escaped(plugin: JsonMimeRenderPlugin):
+    actual = plugin.html(["a", "</script><script>alert(1)</script>"], max_items=1)
+    # It should not allow the payload to close the script element
+    assert actual.count("</script>") == actual.count("<script")
+    assert _payloads(actual) == [["</script><script>alert(1)</script>"]]
+
+
+def test_client_mode(plugin: JsonMimeRenderPlugin):
+    value = {"key": ["value", 1, None]}
+    actual = plugin.html(value, root='"root"', expanded=True, mode="client")
+    # It should only embed the JSON to be rendered in the browser
+    assert "<ul>" not in actual
+    assert 'data-root="&quot;root&quot;"' in actual
+    assert " data-expanded" in actual
+    assert _payloads(actual) == [value]
+
+
+def test_invalid_mode(plugin: JsonMimeRenderPlugin):
+    with pytest.raises(ValueError, match="Invalid mode"):
+        plugin.html({}, mode="invalid")
+
+
+@pytest.mark.parametrize("chunk_size", [1, 100, 1_000_000])
+def test_render_to(plugin: JsonMimeRenderPlugin, chunk_size: int):
+    value = {"key": ["value", 1, None], "other": {"nested": True}}
+    stream = io.StringIO()
+    size = plugin.render_to(stream, value, chunk_size=chunk_size, root="test", expanded=True)
+    # It should write the same HTML as when rendering to a string
+    assert stream.getvalue() == plugin.html(value, root="test", expanded=True)
+    assert size == len(stream.getvalue())
+
+
+@pytest.mark.parametrize("limit, expected", [(None, 7), (7, 7), (3, 4), (0, 1)])
+def test_count_nodes(limit, expected: int):
+    value = {"key": ["value", 1, None], "other": {"nested": True}}
+    # It should count all values, and stop counting after the limit
+    assert count_nodes(value, limit) == expected
+
+
+def test_truncated_json():
+    value = {"key": ["value", 1, None]}
+    assert truncated_json(value, 1000) == json.dumps(value, indent=1)
+    # It should truncate long JSON, and mark it as truncated
+    expected = json.dumps(list(range(10)), indent=1)[:20] + "\n…"
+    assert truncated_json(list(range(10**6)), 20) == expected
+    # It should not fail for values that are not JSON serializable, or nested too deeply
+    assert truncated_json({"set": {1}}, 1000) == '{\n "set": "{1}"\n}'
+    nested = []
+    for _ in range(sys.getrecursionlimit()):
+        nested = [nested]
+    assert truncated_json(nested, 10).endswith("…")
+
+
+def test_enforce_budget(plugin: JsonMimeRenderPlugin):
+    value = {"key": ["value", 1, None], "other": {"nested": True}}
+    html = plugin.html(value)
+    # It should pass the fragments through within the budget
+    assert "".join(enforce_budget(plugin.component(value), 60, len(html))) == html
+    # It should stop rendering when exceeding a budget
+    with pytest.raises(BudgetExceededError, match="larger than"):
+        "".join(enforce_budget(plugin.component(value), max_size=len(html) - 1))
+    with pytest.raises(BudgetExceededError, match="took more than"):
+        "".join(enforce_budget(plugin.component(value), max_seconds=0, start_time=0))
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["abc", 'a"b\\c\n', "äö€😀", "", 0, -42, 10**30, True, False, None, 3.14, -0.0, 1e300]
+    + [1e-300, float("nan"), float("inf"), float("-inf")],
+)
+def test_format_scalar(value):
+    # It should serialize like json.dumps
+    assert format_scalar(value) == json.dumps(value)
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"expanded": True}, {"max_items": 7}, {"max_depth": 1}, {"max_depth": 2, "max_items": 3}],
+)
+@pytest.mark.parametrize("as_mapping", [False, True])
+def test_render_in_parallel(options: dict, as_mapping: bool):
+    value = [{"a": [index, {"b": index}], "c": "x"} for index in range(20)]
+    if as_mapping:
+        value = {f"key{index}": item for index, item in enumerate(value)}
+    plugin = JsonMimeRenderPlugin(workers=2, parallel_min_items=10)
+    # It should produce the same HTML as when rendering in one process
+    assert plugin.html(value, **options) == JsonMimeRenderPlugin().html(value, **options)
+
+
+def test_shutdown_process_pools():
+    pool = get_process_pool(2)
+    assert get_process_pool(2) is pool
+    shutdown_process_pools()
+    # It should shut down the pool, and create a new one when needed again
+    with pytest.raises(RuntimeError):
+        pool.submit(int)
+    new_pool = get_process_pool(2)
+    assert new_pool is not pool
+    assert new_pool.submit(int).result() == 0
+    shutdown_process_pools()
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"expanded": True},
+        {"max_items": 1},
+        {"max_depth": 1},
+        {"max_nodes": 10},
+        {"summary_min_items": 3, "table_min_rows": 2},
+    ],
+)
+def test_render_with_memo(plugin: JsonMimeRenderPlugin, options: dict):
+    record = {"a": [1, {"b": None}], "c": -0.0}
+    # Values with equal JSON should not be confused, like 1 and 1.0, or 0.0 and -0.0
+    value = [record, dict(record), [record], {"a": [1.0, {"b": None}], "c": 0.0}, [[True]], [[1]]]
+    # Repeated summaries and tables, followed by a comma
+    value += [[1, 2, 3], [1, 2, 3], [record, record], [record, record], None]
+    memo = RenderMemo(max_size=10_000)
+    expected = plugin.html(value, **options)
+    # It should produce the same HTML, also when reusing memoized HTML
+    assert plugin.html(value, memo=memo, **options) == expected
+    assert plugin.html(value, memo=memo, **options) == expected
+
+
+def test_table(plugin: JsonMimeRenderPlugin):
+    value = [{"a": index, "b": "<x>", "c": [index, {"d": None}]} for index in range(3)]
+    actual = plugin.html(value, table_min_rows=3, max_items=2)
+    # It should render the keys once, and a row per object with nested values as JSON text
+    assert actual.count("<th>") == 3
+    assert actual.count("<tr>") == 3
+    assert '<span class="myst-nb-json-value">"&lt;x&gt;"</span>' in actual
+    assert '<span class="myst-nb-json-value">[1, {"d": null}]</span>' in actual
+    # It should elide rows beyond the limit
+    assert "… 1 more item<" in actual
+    assert _payloads(actual) == [[value[2]]]
+
+
+@pytest.mark.parametrize(
+    ("value", "options"),
+    [
+        ([{"a": 1}, {"b": 1}], {}),
+        ([{"a": 1}, 1], {}),
+        ([{}, {}], {}),
+        ([{"a": 1}], {}),
+        ([{"a": 1}, {"a": 2}], {"table_min_rows": None}),
+        ({"x": [{"a": 1}, {"a": 2}]}, {"max_depth": 1}),
+    ],
+)
+def test_no_table(plugin: JsonMimeRenderPlugin, value, options: dict):
+    # It should only render non-empty objects with the same keys as table, if enabled
+    actual = plugin.html(value, **{"table_min_rows": 2, **options})
+    assert "<table>" not in actual
+
+
+def test_no_table_by_default(plugin: JsonMimeRenderPlugin):
+    # Tables should be opt-in
+    assert "<table>" not in plugin.html([{"a": index} for index in range(100)])
+
+
+@pytest.mark.parametrize("value", [list(range(20)), tuple(range(20)), array.array("q", range(20))])
+def test_numbers_summary(plugin: JsonMimeRenderPlugin, value):
+    actual = plugin.html({"a": value}, summary_min_items=20)
+    # It should show the first and last values with statistics, and embed all values
+    assert "0, 1, 2, 3, 4, </span>" in actual
+    assert ", 15, 16, 17, 18, 19</span>" in actual
+    assert "… 10 more items …" in actual
+    assert "length 20, min 0, max 19, mean 9.5" in actual
+    assert _payloads(actual) == [list(range(20))]
+
+
+def test_numbers_summary_non_finite(plugin: JsonMimeRenderPlugin):
+    actual = plugin.html([1.5, float("nan"), float("inf")], summary_min_items=3)
+    # It should not compute statistics with NaN
+    assert "length 3, min NaN, max NaN, mean NaN" in actual
+    actual = plugin.html([1.5, float("-inf"), float("inf")], summary_min_items=3)
+    assert "length 3, min -Infinity, max Infinity, mean NaN" in actual
+
+
+@pytest.mark.parametrize(
+    "value",
+    [[1, 2, True], [1, 2, "3"], [1, 2, None], [1, 2, [3]], [1, 2], {"a": 1, "b": 2, "c": 3}],
+)
+def test_no_numbers_summary(plugin: JsonMimeRenderPlugin, value):
+    # It should only summarize flat arrays of int and float values, if long enough
+    assert '<span class="myst-nb-json-summary' not in plugin.html(value, summary_min_items=3)
+
+
+def test_numbers_summary_large_integers(plugin: JsonMimeRenderPlugin):
+    # It should render numbers beyond the range of floats as list, since they cannot be summarized
+    actual = plugin.html([10**400, 1, 2], summary_min_items=2)
+    assert '<span class="myst-nb-json-summary' not in actual
+    assert str(10**400) in actual
+    # It should compute the mean even if the sum is beyond the range of floats
+    actual = plugin.html([10**308, 10**308, 0.0], summary_min_items=3)
+    assert "mean 6.66667e+307" in actual
+
+
+def test_no_numbers_summary_by_default(plugin: JsonMimeRenderPlugin):
+    # Summaries should be opt-in
+    assert '<span class="myst-nb-json-summary' not in plugin.html(list(range(1000)))
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [(1, (1, 0)), ([], (1, 0)), ([1, [2, {}]], (5, 2)), ({"a": {"b": [1]}, "c": 2}, (5, 3))],
+)
+def test_json_stats(value, expected: tuple):
+    # It should count all values, and the maximum depth below the root
+    assert json_stats(value) == expected
+
+
+@pytest.mark.parametrize(
+    "options",
+    [{}, {"expanded": True}, {"max_items": 1}, {"max_depth": 1}, {"max_nodes": 4}],
+)
+@pytest.mark.parametrize(
+    "value", [1, [], {"a": [1, {"b": None}, []], "c": {}}, [[{"a": [1, 2]}], [[]], 3]]
+)
+def test_stream_component(plugin: JsonMimeRenderPlugin, value, options: dict):
+    events = iter_events(json.dumps(value).encode())
+    actual = "".join(plugin.stream_component(events, **options))
+    expected = plugin.html(value, table_min_rows=None, summary_min_items=None, **options)
+    # It should render like the Python object, but without embedding elided items
+    expected = re.sub(r'<script type="application/json">.*?</script>', "", expected)
+    expected = expected.replace(" tabindex=0>…", ">…")
+    assert actual == expected
+
+
+def test_stream_component_truncated(plugin: JsonMimeRenderPlugin):
+    with pytest.raises(ValueError, match="Unexpected end"):
+        "".join(plugin.stream_component([(START_ARRAY, None), (VALUE, 1)]))
+
+
+@pytest.mark.parametrize(
+    "options", [{}, {"expanded": True}, {"max_items": 1}, {"table_min_rows": 2}, {"mode": "client"}]
+)
+def test_compact(options: dict):
+    value = {"a": [1, {"b": None}], "c": [{"d": 1}, {"d": 2}], "e": list(range(200))}
+    full = JsonMimeRenderPlugin(inline_assets=False).html(value, **options)
+    compact = JsonMimeRenderPlugin(inline_assets=False, compact=True).html(value, **options)
+    # It should render the same values with short class names and without hidden punctuation
+    assert "myst-nb-json-compact" in compact
+    assert "myst-nb-json-hidden" not in compact
+    full_without_punctuation = re.sub(r'<span class="myst-nb-json-hidden">[^<]*</span>', "", full)
+    assert _strip_xml_tags(compact) == _strip_xml_tags(full_without_punctuation)
+    assert _payloads(compact) == _payloads(full)
+
+
+def test_compact_size():
+    value = {f"key{index}": {"id": index, "tags": ["a", "b"]} for index in range(100)}
+    full = JsonMimeRenderPlugin(inline_assets=False).html(value)
+    compact = JsonMimeRenderPlugin(inline_assets=False, compact=True).html(value)
+    # It should cut the HTML of a tree by more than half
+    assert len(compact) < len(full) / 2
+
+
+def test_search_index():
+    value = {"a": [1, {"b": "x" * 200}], "c": [{"d": 1, "e": 2}, {"e": 3, "d": 4}], "f": [0.5] * 3}
+    actual = search_index(value, table_min_rows=2, summary_min_items=3)
+    # It should list the values in rendering order, with table rows in the order of the columns,
+    # and without the items of summarized arrays
+    assert actual == {
+        "depths": [0, 1, 2, 2, 3, 1, 2, 3, 3, 2, 3, 3, 1],
+        "keys": [None, "a", None, None, "b", "c", None, "d", "e", None, "d", "e", "f"],
+        "values": [None, None, "1", None, "x" * 100, None, None, "1", "2", None, "4", "3", None],
+    }
+
+
+def test_search_index_virtual():
+    value = {"a": [{"d": 1, "e": 2}, {"e": 3, "d": 4}], "f": [0.5] * 3}
+    actual = search_index(value, table_min_rows=2, summary_min_items=3, virtual_min_items=2)
+    # The items of virtual lists are rendered in the browser, which does not render tables and
+    # summaries
+    assert actual == {
+        "depths": [0, 1, 2, 3, 3, 2, 3, 3, 1, 2, 2, 2],
+        "keys": [None, "a", None, "d", "e", None, "e", "d", "f", None, None, None],
+        "values": [None, None, None, "1", "2", None, "3", "4", None, "0.5", "0.5", "0.5"],
+    }
+
+
+def test_search_index_max_depth():
+    value = {"a": [{"d": 1, "e": 2}, {"e": 3, "d": 4}], "b": {"f": [0.5] * 3}}
+    actual = search_index(value, table_min_rows=2, summary_min_items=3, max_depth=1)
+    # The values beyond the maximum depth are rendered in the browser, which does not render tables
+    # and summaries, so the rows list their keys in their own order, and the numbers are listed
+    assert actual == {
+        "depths": [0, 1, 2, 3, 3, 2, 3, 3, 1, 2, 3, 3, 3],
+        "keys": [None, "a", None, "d", "e", None, "e", "d", "b", "f", None, None, None],
+        "values": [None, None, None, "1", "2", None, "3", "4", None, None, "0.5", "0.5", "0.5"],
+    }
+    # It should only list the values within the limits as rendered
+    assert search_index(value, table_min_rows=2, summary_min_items=3, max_depth=2) == search_index(
+        value, table_min_rows=2, summary_min_items=3
+    )
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_virtual_list(compact: bool):
+    plugin = JsonMimeRenderPlugin(inline_assets=False, compact=compact)
+    items = {"3": "c", "1": "a", "0": None, "": 1}
+    value = {"long": list(range(5)), "short": [1, 2], "items": items}
+    html = plugin.html(value, expanded=True, virtual_min_items=4)
+    assert 'data-virtual-min-items="4"' in html
+    # Long arrays and objects should only embed their items, object items as pairs
+    assert html.count('<ul class="myst-nb-json-virtual">') == 2
+    assert '<script type="application/json">[0,1,2,3,4]</script>' in html
+    assert '<script type="application/json">[["3","c"],["1","a"],["0",null],["",1]]<' in html
+    assert ">0<" not in _strip_xml_attributes(html)
+    # Short arrays should be rendered as usual
+    assert ">2</span>" in html
+    # The root value should be rendered as virtual list with its children expanded
+    root_html = plugin.html(value, expanded=True, virtual_min_items=3)
+    assert '<ul class="myst-nb-json-virtual" data-expanded>' in root_html
+
+
+@pytest.mark.parametrize("mode", ["server", "client"])
+def test_search_box(plugin: JsonMimeRenderPlugin, mode: str):
+    value = {"a": [1, 2], "b": None}
+    actual = plugin.html(value, mode=mode, search_min_nodes=5)
+    # It should embed the index in a search box before the value
+    assert '<div class="myst-nb-json-search"><input type="search"' in actual
+    assert _payloads(actual)[0] == search_index(value)
+    # It should not add a search box to smaller values
+    assert 'class="myst-nb-json-search"' not in plugin.html(value, mode=mode, search_min_nodes=6)
+
+
+class _Color(str, enum.Enum):
+    RED = "red"
+
+
+@pytest.mark.parametrize(
+    "value, kind, nested",
+    [
+        ("abc", 0, False),
+        (_Color.RED, 0, False),
+        (enum.IntEnum("Number", "ONE")(1), 0, False),
+        (None, 0, False),
+        (["a"], 1, True),
+        ((), 0, False),
+        (collections.UserList(["a"]), 1, True),
+        (range(3), 1, True),
+        ({"a": 1}, 2, True),
+        (collections.OrderedDict(a=1), 2, True),
+        (collections.UserDict(a=1), 2, True),
+        (array.array("d", [1.0]), 4, True),
+    ],
+)
+def test_value_kind(value, kind: int, nested: bool):
+    # It should dispatch on the concrete type, also for subclasses and other collections
+    assert value_kind(value, summary_min_items=1) == kind
+    # It should give the same result when the type is known
+    assert value_kind(value, summary_min_items=1) == kind
+    assert is_nested(value) == nested
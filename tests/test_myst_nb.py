@@ -1,4 +1,8 @@
+import json
+from pathlib import Path
+
 import pytest
+from docutils import nodes
 
 from tests.conftest import clean_doctree, file_regression, get_test_path, sphinx_run  # noqa: F401
 
@@ -15,3 +19,238 @@ def test_render_json_output(
     assert sphinx_run.warnings() == ""
     doctree = clean_doctree(sphinx_run.get_resolved_doctree("json_output"))
     file_regression.check(doctree.pformat(), extension=".xml", encoding="utf-8")
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={"nb_execution_mode": "force", "extensions": ["myst_nb", "myst_nb_json"]},
+)
+def test_render_json_output_as_extension(sphinx_run):  # noqa: F811
+    """Test that as Sphinx extension, CSS and JavaScript are added once per page"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    assert "myst-nb-json-value" in doctree.pformat()
+    assert "<style>" not in doctree.pformat()
+    assert "<script" not in doctree.pformat()
+    html = (Path(sphinx_run.app.outdir) / "json_output.html").read_text(encoding="utf-8")
+    assert html.count("_static/myst-nb-json.css") == 1
+    assert html.count("_static/myst-nb-json.js") == 1
+    assert (Path(sphinx_run.app.outdir) / "_static" / "myst-nb-json.js").exists()
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_max_items": 2,
+    },
+)
+def test_render_json_output_with_limits(sphinx_run):  # noqa: F811
+    """Test that limits from the Sphinx configuration are applied"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    assert "… 1 more item<" in doctree.pformat()
+    assert "… 6 more items<" in doctree.pformat()
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={"nb_execution_mode": "force", "extensions": ["myst_nb", "myst_nb_json"]},
+)
+def test_render_json_output_cached(sphinx_run):  # noqa: F811
+    """Test that rendered outputs are cached in the build directory"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    assert sphinx_run.env.myst_nb_json_cache_stats == {"misses": 1}
+    cache_dir = Path(sphinx_run.app.doctreedir) / "myst-nb-json-cache"
+    assert len(list(cache_dir.glob("*/*.html"))) == 1
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_spool_size": 1024,
+    },
+)
+def test_render_json_output_spooled(sphinx_run):  # noqa: F811
+    """Test that outputs can be rendered through a spooled temporary file"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    assert "key28" in doctree.pformat()
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_memo_size": 1024**2,
+    },
+)
+def test_render_json_output_memoized(sphinx_run):  # noqa: F811
+    """Test that outputs can be rendered with a memo table"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    assert "key28" in doctree.pformat()
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_report_top": 3,
+        "myst_nb_json_report_file": "report.json",
+        "myst_nb_json_warn_bytes": 100,
+    },
+)
+def test_render_json_output_report(sphinx_run):  # noqa: F811
+    """Test that metrics of outputs are reported, and outputs exceeding a budget are warned about"""
+    sphinx_run.build()
+    assert "JSON output has" in sphinx_run.warnings()
+    assert "myst_nb_json_warn_bytes (100)" in sphinx_run.warnings()
+    report = json.loads((Path(sphinx_run.app.outdir) / "report.json").read_text())
+    assert len(report["outputs"]) == 1
+    output = report["outputs"][0]
+    assert output["docname"] == "json_output"
+    assert (output["nodes"], output["depth"]) == (20, 2)
+    assert output["bytes"] > 100
+    assert not output["cached"]
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_budget_nodes": 5,
+    },
+)
+def test_render_json_output_budget(sphinx_run):  # noqa: F811
+    """Test that outputs exceeding a render budget fall back to plain text"""
+    sphinx_run.build()
+    assert "JSON output exceeds its render budget" in sphinx_run.warnings()
+    assert "more than 5 values" in sphinx_run.warnings()
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    (block,) = [
+        node for node in doctree.findall(nodes.literal_block) if "text_plain" in node["classes"]
+    ]
+    assert block.astext().startswith("{")
+    assert "myst-nb-json" not in doctree.pformat()
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_budget_bytes": 100,
+        "myst_nb_json_budget_fallback": "next",
+    },
+)
+def test_render_json_output_budget_next(sphinx_run):  # noqa: F811
+    """Test that outputs exceeding a render budget can fall back to the next MIME type"""
+    sphinx_run.build()
+    assert "characters" in sphinx_run.warnings()
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    assert "IPython.core.display.JSON object" in doctree.astext()
+    assert "myst-nb-json" not in doctree.pformat()
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_compact": True,
+    },
+)
+def test_render_json_output_compact(sphinx_run):  # noqa: F811
+    """Test that outputs can be rendered with compact markup"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    assert "myst-nb-json-compact" in doctree.pformat()
+    assert "myst-nb-json-hidden" not in doctree.pformat()
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_sidecar_size": 10,
+    },
+)
+def test_render_json_output_sidecar(sphinx_run):  # noqa: F811
+    """Test that large outputs are written to data files"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    assert "data-sidecar=" in doctree.pformat()
+    assert "myst-nb-json-value" in doctree.pformat()
+    (name,) = sphinx_run.env.myst_nb_json_sidecars["json_output"]
+    path = Path(sphinx_run.app.outdir) / "_static" / "myst-nb-json-data" / f"{name}.js"
+    content = path.read_text(encoding="utf-8")
+    assert content.startswith(f'mystNbJsonLoad("{name}", "')
+    json_text = json.loads(content[content.index(", ") + 2 : content.rindex(");")])
+    assert json.loads(json_text)["key2"]["key22"] == 42
+
+
+@pytest.mark.sphinx_params(
+    "json_output.ipynb",
+    conf={
+        "nb_execution_mode": "force",
+        "extensions": ["myst_nb", "myst_nb_json"],
+        "myst_nb_json_sidecar_size": 10,
+        "myst_nb_json_search_min_nodes": 1,
+    },
+)
+def test_render_json_output_sidecar_search(sphinx_run):  # noqa: F811
+    """Test that the search index of large outputs is written to a data file"""
+    sphinx_run.build()
+    assert sphinx_run.warnings() == ""
+    doctree = sphinx_run.get_resolved_doctree("json_output")
+    names = sphinx_run.env.myst_nb_json_sidecars["json_output"]
+    assert len(names) == 2
+    html = doctree.pformat()
+    assert any(f'class="myst-nb-json-search" data-sidecar="{name}"' in html for name in names)
+
+
+def test_json_view_directive(make_app, tmp_path):
+    (tmp_path / "conf.py").write_text(
+        'extensions = ["myst_nb", "myst_nb_json"]\nmyst_nb_json_max_items = 2\n'
+    )
+    (tmp_path / "index.rst").write_text(
+        "Data\n====\n\n"
+        ".. json-view:: data/values.json\n   :root: values\n   :expanded:\n\n"
+        ".. json-view:: missing.json\n"
+    )
+    (tmp_path / "data").mkdir()
+    (tmp_path / "data" / "values.json").write_text(json.dumps({"a": [1, 2, 3], "b": None}))
+    app = make_app(srcdir=tmp_path)
+    app.build()
+    # It should warn about files that cannot be read, and not stop the build
+    assert "Cannot render JSON file 'missing.json'" in app._warning.getvalue()
+    html = (Path(app.outdir) / "index.html").read_text(encoding="utf-8")
+    assert "values<" in html
+    assert "… 1 more item<" in html
+    assert '<li class=""><span class="myst-nb-json-key myst-nb-json-collapsible"' in html
+    # It should rebuild the document when the file changes
+    dependencies = {str(path) for path in app.env.dependencies["index"]}
+    assert str(tmp_path / "data" / "values.json") in dependencies
+
+
+def test_setup_is_parallel_safe(make_app, tmp_path):
+    (tmp_path / "conf.py").write_text("")
+    app = make_app(srcdir=tmp_path, confoverrides={"extensions": ["myst_nb_json"]})
+    # It should allow parallel reading and writing
+    assert app.is_parallel_allowed("read")
+    assert app.is_parallel_allowed("write")
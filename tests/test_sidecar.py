@@ -0,0 +1,29 @@
+import json
+from pathlib import Path
+
+from myst_nb_json.sidecar import copy_sidecars, write_sidecar
+
+
+def test_write_sidecar(tmp_path: Path):
+    name = write_sidecar(tmp_path, '{"a":"</script>\\u00e4"}')
+    # It should name the file by its content, and share it between equal objects
+    assert write_sidecar(tmp_path, '{"a":"</script>\\u00e4"}') == name
+    assert write_sidecar(tmp_path, '{"a":2}') != name
+    content = (tmp_path / f"{name}.js").read_text(encoding="utf-8")
+    # It should call the global function with the JSON as string
+    prefix = f'mystNbJsonLoad("{name}", '
+    assert content.startswith(prefix)
+    assert json.loads(content[len(prefix) : content.rindex(");")]) == '{"a":"</script>\\u00e4"}'
+
+
+def test_copy_sidecars(tmp_path: Path):
+    source = tmp_path / "source"
+    target = tmp_path / "target"
+    used = write_sidecar(source, "[1]")
+    unused = write_sidecar(source, "[2]")
+    target.mkdir()
+    (target / f"{unused}.js").write_text("")
+    copy_sidecars(source, target, [used])
+    # It should copy the files in use, and remove the others
+    assert [path.name for path in target.iterdir()] == [f"{used}.js"]
+    assert [path.name for path in source.iterdir()] == [f"{used}.js"]
@@ -0,0 +1,67 @@
+import json
+
+import pytest
+
+from myst_nb_json.stream import (
+    END_ARRAY,
+    END_MAP,
+    MAP_KEY,
+    START_ARRAY,
+    START_MAP,
+    VALUE,
+    iter_events,
+    open_json,
+)
+
+
+def test_iter_events():
+    text = ' {"a": [1, -2.5e3, "x\\"\\u00e4"], "": {"b": [true, false, null, {}]}} '
+    expected = [
+        (START_MAP, None),
+        (MAP_KEY, "a"),
+        (START_ARRAY, None),
+        (VALUE, 1),
+        (VALUE, -2500.0),
+        (VALUE, 'x"ä'),
+        (END_ARRAY, None),
+        (MAP_KEY, ""),
+        (START_MAP, None),
+        (MAP_KEY, "b"),
+        (START_ARRAY, None),
+        (VALUE, True),
+        (VALUE, False),
+        (VALUE, None),
+        (START_MAP, None),
+        (END_MAP, None),
+        (END_ARRAY, None),
+        (END_MAP, None),
+        (END_MAP, None),
+    ]
+    assert list(iter_events(text.encode())) == expected
+
+
+@pytest.mark.parametrize("text", ["0", "-0.0", "1e300", '"äö€😀"', "NaN", "-Infinity"])
+def test_iter_events_scalar_types(text: str):
+    # It should decode values like json.loads
+    events = list(iter_events(text.encode()))
+    expected = json.loads(text)
+    assert len(events) == 1
+    assert json.dumps(events[0][1]) == json.dumps(expected)
+    assert type(events[0][1]) is type(expected)
+
+
+@pytest.mark.parametrize(
+    "text",
+    ["", " ", "[", "[1,]", "[1 2]", "{1: 2}", '{"a" 1}', '{"a": 1,}', "[1]]", "]", "01", "[1] x"],
+)
+def test_iter_events_invalid(text: str):
+    with pytest.raises(ValueError, match="at byte"):
+        list(iter_events(text.encode()))
+
+
+@pytest.mark.parametrize("text", ["", '{"a": [1, 2]}'])
+def test_open_json(tmp_path, text: str):
+    path = tmp_path / "data.json"
+    path.write_text(text)
+    with open_json(path) as buffer:
+        assert bytes(buffer) == text.encode()